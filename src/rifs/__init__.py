@@ -1,7 +1,50 @@
 """Initailize the rifs package.
+
+Notes:
+    The submodules and their attributes are imported on first access, a farm task that only calls its
+    operation doesn't pay for the submission and resolver modules.
 """
 
-from rifs import core
-from rifs.transmit import Constructor, only_one
+import importlib as _importlib
+import typing as _typing
+
+if _typing.TYPE_CHECKING:
+    from rifs import core
+    from rifs.transmit import Constructor, only_one, only_one_async
 
 __all__ = ["core"]
+
+
+# The module and the attribute name of each lazy attribute, None for the module itself
+_LAZY_ATTRIBUTES: _typing.Dict[str, _typing.Tuple[str, _typing.Optional[str]]] = {
+    "core": ("rifs.core", None),
+    "Constructor": ("rifs.transmit", "Constructor"),
+    "only_one": ("rifs.transmit", "only_one"),
+    "only_one_async": ("rifs.transmit", "only_one_async"),
+}
+
+
+def __getattr__(name: str) -> _typing.Any:
+    """Import the module of the lazy attribute on first access.
+
+    Args:
+        name (str): The attribute name.
+
+    Raises:
+        AttributeError: If the attribute isn't a lazy attribute.
+
+    Returns:
+        Any: The attribute.
+    """
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attribute = _LAZY_ATTRIBUTES[name]
+    module = _importlib.import_module(module_name)
+    value = module if attribute is None else getattr(module, attribute)
+    # Later accesses find the attribute without going through __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> _typing.List[str]:
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -0,0 +1,447 @@
+"""The benchmark module measures how the build, resolve and insert_job stages scale with the size and the
+shape of a submission, saves the measurements as a json baseline and flags the regressions against one.
+
+The DAGs are synthesized from stand in operations, the scripts go to a throwaway temporary root and the
+farm submission is stubbed, so the benchmark runs offline.
+
+Shapes:
+    chain      every operation depends on the previous one
+    fanout     every operation depends on the first one
+    diamond    a top operation, two operations depending on it, a bottom one depending on both, repeated
+
+Stages:
+    build        Constructor.build, the scripts and the jobs
+    resolve      Resolver.resolve of the built resolver
+    insert_job   insert_job of every operation
+    insert_jobs  insert_jobs of all the operations at once
+    submit       Constructor.submit end to end, with the farm submission stubbed
+    stream       Constructor.submit in streaming mode, with the farm submission stubbed
+    import       python -X importtime -c "import rifs" in a fresh interpreter, measured once per run
+
+The import budget fails the run when importing rifs takes longer than the budget, or when it loads the
+modules a farm task calling its operation doesn't need, see EAGER_MODULES. The test suite runs the same
+check in tests/test_import_time.py.
+
+Examples:
+    $ python -m rifs.benchmark --sizes 100 1000 10000 100000 --save baseline.json
+    $ python -m rifs.benchmark --baseline baseline.json --threshold 0.25
+    $ python -m rifs.benchmark --stages import --import-budget 0.05
+"""
+
+import argparse as _argparse
+import contextlib as _contextlib
+import dataclasses as _dataclasses
+import functools as _functools
+import json as _json
+import os as _os
+import platform as _platform
+import re as _re
+import subprocess as _subprocess
+import sys as _sys
+import tempfile as _tempfile
+import time as _time
+import tracemalloc as _tracemalloc
+import typing as _typing
+
+from unittest import mock as _mock
+
+# Package imports
+from rifs.core import abstraction as _abstraction
+from rifs.core import constants as _constants
+from rifs.core import transmission as _transmission
+from rifs.core.abstraction import AbstractRif as _AbstractRif
+from rifs.core.soumission import _Job, insert_job as _insert_job, insert_jobs as _insert_jobs
+from rifs.operations.ruke import NukeOperation as _NukeOperation
+from rifs.transmit import Constructor as _Constructor
+
+__all__ = [
+    "check_import",
+    "compare",
+    "import_time",
+    "load_baseline",
+    "main",
+    "run",
+    "save_baseline",
+    "synthesize",
+    "BenchmarkResult",
+]
+
+
+BASELINE_VERSION = 1
+KINDS = ("rif", "nuke")
+SHAPES = ("chain", "fanout", "diamond")
+STAGES = ("build", "resolve", "insert_job", "insert_jobs", "submit", "stream", "import")
+# The modules import rifs must leave to the first access of their attributes
+EAGER_MODULES = (
+    "rifs.core.abstraction",
+    "rifs.core.resolver",
+    "rifs.core.soumission",
+    "rifs.core.transmission",
+    "rifs.transmit",
+)
+
+# A line of python -X importtime: the self and cumulative microseconds, then the indented module name
+_IMPORT_TIME_PATTERN = _re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)$")
+
+
+@_dataclasses.dataclass
+class _BenchmarkRif(_AbstractRif):
+    """The stand in python operation, it does nothing when called.
+
+    Attributes:
+        index (int): The position of the operation, keeps every generated script unique.
+    """
+
+    index: int = 0
+
+    def __call__(self, *args, **kwargs) -> None:
+        return None
+
+
+@_dataclasses.dataclass
+class BenchmarkResult:
+    """The measurement of a stage.
+
+    Attributes:
+        shape (str): The shape of the DAG.
+        kind (str): The kind of operations, rif or nuke.
+        size (int): The number of operations.
+        stage (str): The measured stage.
+        seconds (float): The best wall time of the repeats.
+        peak_bytes (int): The peak memory allocated by the stage, traced with tracemalloc.
+    """
+
+    shape: str
+    kind: str
+    size: int
+    stage: str
+    seconds: float
+    peak_bytes: int
+
+    @property
+    def key(self) -> str:
+        """str: The key of the measurement in the baseline."""
+        return f"{self.shape}/{self.kind}/{self.size}/{self.stage}"
+
+
+def _operation(kind: str, index: int) -> _AbstractRif:
+    """Create a stand in operation.
+
+    Args:
+        kind (str): The kind of operation, rif or nuke.
+        index (int): The position of the operation.
+
+    Returns:
+        AbstractRif: The operation.
+    """
+    if kind == "nuke":
+        return _NukeOperation(script=f"/benchmark/comp_{index}.nk", frange="1001-1100", nodes=["Write1"])
+    return _BenchmarkRif(index=index)
+
+
+def synthesize(shape: str, size: int, kind: str = "rif") -> _typing.List[_AbstractRif]:
+    """Synthesize the operations of a DAG.
+
+    Args:
+        shape (str): The shape of the DAG, one of SHAPES.
+        size (int): The number of operations.
+        kind (str, optional): The kind of operations, one of KINDS. Defaults to "rif".
+
+    Raises:
+        ValueError: If the shape or the kind isn't known.
+
+    Returns:
+        List[AbstractRif]: The operations, in submission order.
+    """
+    if shape not in SHAPES or kind not in KINDS:
+        raise ValueError(f"Unknown benchmark shape {shape!r} or kind {kind!r}.")
+
+    operations = [_operation(kind, index) for index in range(size)]
+    for index, operation in enumerate(operations[1:], start=1):
+        if shape == "chain":
+            operation.depend_on = [operations[index - 1]]
+        elif shape == "fanout":
+            operation.depend_on = [operations[0]]
+        elif index % 3 == 0:
+            # The bottom of the diamond, also the top of the next one
+            operation.depend_on = [operations[index - 2], operations[index - 1]]
+        else:
+            operation.depend_on = [operations[index - index % 3]]
+
+    return operations
+
+
+def _measure(stage: _typing.Callable[[], _typing.Any], repeat: int) -> _typing.Tuple[float, int]:
+    """Measure the best wall time of the stage, then its peak memory in a separate traced call.
+
+    Args:
+        stage (Callable): The stage to measure.
+        repeat (int): The number of timed calls.
+
+    Returns:
+        Tuple[float, int]: The best seconds and the peak bytes.
+    """
+    timings = []
+    for _ in range(max(repeat, 1)):
+        _reset_caches()
+        start = _time.perf_counter()
+        stage()
+        timings.append(_time.perf_counter() - start)
+
+    # Tracing slows the stage down, keep it out of the timings
+    _reset_caches()
+    _tracemalloc.start()
+    try:
+        stage()
+        _, peak_bytes = _tracemalloc.get_traced_memory()
+    finally:
+        _tracemalloc.stop()
+
+    return min(timings), peak_bytes
+
+
+def _reset_caches() -> None:
+    """Forget the rendered scripts, every call of a stage renders and hashes them again."""
+    _transmission._render_script.cache_clear()  # pylint: disable=protected-access
+
+
+def _stages(operations: _typing.List[_AbstractRif], manifest: bool) -> _typing.Dict[str, _typing.Callable]:
+    """Create the stage callables of a DAG.
+
+    Args:
+        operations (List[AbstractRif]): The operations of the DAG.
+        manifest (bool): Build in manifest mode.
+
+    Returns:
+        Dict[str, Callable]: The callable of each stage.
+    """
+    constructor = _Constructor(operations, manifest=manifest)
+    built = constructor.build()
+    return {
+        "build": constructor.build,
+        "resolve": built.resolve,
+        "insert_job": lambda: [
+            _insert_job(operation, "benchmark.py", **operation.soumission_kwargs) for operation in operations
+        ],
+        "insert_jobs": lambda: _insert_jobs(operations, ["benchmark.py"] * len(operations)),
+        "submit": constructor.submit,
+        "stream": _functools.partial(constructor.submit, stream=True),
+    }
+
+
+def import_time(module: str = "rifs", repeat: int = 5) -> _typing.Tuple[float, _typing.List[str]]:
+    """Measure the import of the module with python -X importtime, each repeat in a fresh interpreter.
+
+    Args:
+        module (str, optional): The module to import. Defaults to "rifs".
+        repeat (int, optional): The number of interpreters, the best one is kept. Defaults to 5.
+
+    Raises:
+        RuntimeError: If the import failed.
+
+    Returns:
+        Tuple[float, List[str]]: The best cumulative seconds and the modules the import loaded.
+    """
+    environment = dict(_os.environ, PYTHONPATH=_os.pathsep.join(path for path in _sys.path if path))
+    timings = []
+    modules: _typing.List[str] = []
+    for _ in range(max(repeat, 1)):
+        process = _subprocess.run(
+            [_sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True,
+            text=True,
+            env=environment,
+            check=False,
+        )
+        if process.returncode:
+            raise RuntimeError(f"import {module} failed: {process.stderr.strip()}")
+        microseconds = 0
+        modules = []
+        for line in process.stderr.splitlines():
+            match = _IMPORT_TIME_PATTERN.match(line)
+            if match:
+                modules.append(match.group(3))
+                # The cumulative time of the module holds the time of everything it imported
+                if match.group(3) == module:
+                    microseconds = int(match.group(2))
+        timings.append(microseconds / 1e6)
+
+    return min(timings), modules
+
+
+def check_import(budget: float, module: str = "rifs", repeat: int = 5) -> _typing.List[str]:
+    """Check the import of the module against the budget and the lazy modules.
+
+    Args:
+        budget (float): The most seconds the import may take.
+        module (str, optional): The module to import. Defaults to "rifs".
+        repeat (int, optional): The number of interpreters, the best one is kept. Defaults to 5.
+
+    Returns:
+        List[str]: A description of each violation, empty if there is none.
+    """
+    seconds, modules = import_time(module, repeat)
+    violations = [f"import {module} loaded {eager}" for eager in EAGER_MODULES if eager in modules]
+    if seconds > budget:
+        violations.append(f"import {module}: {seconds:.4f}s, budget {budget:.4f}s")
+    return violations
+
+
+def run(
+    sizes: _typing.Sequence[int] = (100, 1000, 10000),
+    shapes: _typing.Sequence[str] = SHAPES,
+    kinds: _typing.Sequence[str] = KINDS,
+    stages: _typing.Sequence[str] = STAGES,
+    repeat: int = 1,
+    manifest: bool = False,
+) -> _typing.List[BenchmarkResult]:
+    """Measure the stages over every combination of size, shape and kind.
+
+    Args:
+        sizes (Sequence[int], optional): The numbers of operations. Defaults to (100, 1000, 10000).
+        shapes (Sequence[str], optional): The shapes of the DAGs. Defaults to SHAPES.
+        kinds (Sequence[str], optional): The kinds of operations. Defaults to KINDS.
+        stages (Sequence[str], optional): The stages to measure. Defaults to STAGES.
+        repeat (int, optional): The number of timed calls per stage, the best one is kept. Defaults to 1.
+        manifest (bool, optional): Build in manifest mode. Defaults to False.
+
+    Returns:
+        List[BenchmarkResult]: The measurement of each stage.
+    """
+    results = []
+    if "import" in stages:
+        seconds, _ = import_time(repeat=max(repeat, 5))
+        results.append(BenchmarkResult("import", "rifs", 0, "import", seconds, 0))
+        stages = [stage for stage in stages if stage != "import"]
+        if not stages:
+            return results
+
+    with _contextlib.ExitStack() as stack:
+        # Offline: a throwaway temporary root and no farm
+        root = stack.enter_context(_tempfile.TemporaryDirectory(prefix="rifs_benchmark_"))
+        stack.enter_context(_mock.patch.object(_constants, "RIF_TEMPORARY_ROOT", root))
+        stack.enter_context(_mock.patch.object(_constants, "RIF_SCRIPT_STORE_ROOT", root + "/store"))
+        stack.enter_context(_mock.patch.object(_Job, "submit", lambda job: (job.job_name, "0")))
+        stack.callback(_abstraction._session_temporary_path.cache_clear)  # pylint: disable=protected-access
+        stack.callback(_reset_caches)
+        _abstraction._session_temporary_path.cache_clear()  # pylint: disable=protected-access
+
+        for size in sizes:
+            for shape in shapes:
+                for kind in kinds:
+                    stage_callables = _stages(synthesize(shape, size, kind), manifest)
+                    for stage in stages:
+                        seconds, peak_bytes = _measure(stage_callables[stage], repeat)
+                        results.append(BenchmarkResult(shape, kind, size, stage, seconds, peak_bytes))
+
+    return results
+
+
+def save_baseline(results: _typing.List[BenchmarkResult], path: str) -> str:
+    """Save the measurements as a json baseline.
+
+    Args:
+        results (List[BenchmarkResult]): The measurements.
+        path (str): The path to the baseline.
+
+    Returns:
+        str: The path to the baseline.
+    """
+    baseline = {
+        "version": BASELINE_VERSION,
+        "python": _platform.python_version(),
+        "results": {result.key: {"seconds": result.seconds, "peak_bytes": result.peak_bytes} for result in results},
+    }
+    with open(path, "w", encoding="utf-8") as open_baseline_file:
+        _json.dump(baseline, open_baseline_file, indent=4, sort_keys=True)
+    return path
+
+
+def load_baseline(path: str) -> _typing.Dict[str, _typing.Dict[str, float]]:
+    """Load the measurements of a json baseline.
+
+    Args:
+        path (str): The path to the baseline.
+
+    Raises:
+        ValueError: If the baseline version isn't supported.
+
+    Returns:
+        Dict[str, Dict[str, float]]: The seconds and peak bytes, keyed by measurement.
+    """
+    with open(path, "r", encoding="utf-8") as open_baseline_file:
+        baseline = _json.load(open_baseline_file)
+    if baseline.get("version") != BASELINE_VERSION:
+        raise ValueError(f"Unsupported benchmark baseline version {baseline.get('version')} in {path}.")
+    return baseline["results"]
+
+
+def compare(
+    results: _typing.List[BenchmarkResult],
+    baseline: _typing.Dict[str, _typing.Dict[str, float]],
+    threshold: float = 0.25,
+    min_seconds: float = 0.01,
+) -> _typing.List[str]:
+    """Flag the measurements worse than the baseline by more than the threshold.
+
+    Args:
+        results (List[BenchmarkResult]): The measurements.
+        baseline (Dict[str, Dict[str, float]]): The baseline measurements, from load_baseline.
+        threshold (float, optional): The allowed ratio over the baseline. Defaults to 0.25, 25% worse.
+        min_seconds (float, optional): The wall times under this are noise and never flagged. Defaults to 0.01.
+
+    Returns:
+        List[str]: A description of each regression, empty if there is none.
+    """
+    regressions = []
+    for result in results:
+        reference = baseline.get(result.key)
+        if reference is None:
+            continue
+        if result.seconds >= min_seconds and result.seconds > reference["seconds"] * (1 + threshold):
+            regressions.append(f"{result.key}: {result.seconds:.4f}s, baseline {reference['seconds']:.4f}s")
+        if result.peak_bytes > reference["peak_bytes"] * (1 + threshold):
+            regressions.append(f"{result.key}: {result.peak_bytes} bytes, baseline {reference['peak_bytes']} bytes")
+    return regressions
+
+
+def main(arguments: _typing.Optional[_typing.List[str]] = None) -> int:
+    """Run the benchmark from the command line.
+
+    Args:
+        arguments (List[str], optional): The command line arguments. Defaults to sys.argv.
+
+    Returns:
+        int: The exit status, 1 if a regression or an import violation was flagged.
+    """
+    parser = _argparse.ArgumentParser(prog="rifs.benchmark", description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--shapes", nargs="+", choices=SHAPES, default=list(SHAPES))
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=list(KINDS))
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--manifest", action="store_true", help="Build in manifest mode.")
+    parser.add_argument("--save", help="Save the measurements as a baseline.")
+    parser.add_argument("--baseline", help="Flag the regressions against this baseline.")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument("--import-budget", type=float, help="Fail when import rifs takes longer, in seconds.")
+    options = parser.parse_args(arguments)
+
+    results = run(options.sizes, options.shapes, options.kinds, options.stages, options.repeat, options.manifest)
+    for result in results:
+        print(f"{result.key:<40} {result.seconds:>10.4f}s {result.peak_bytes / 2**20:>10.2f}MB")
+
+    if options.save:
+        save_baseline(results, options.save)
+    regressions = []
+    if options.import_budget is not None:
+        regressions.extend(check_import(options.import_budget))
+    if options.baseline:
+        regressions.extend(compare(results, load_baseline(options.baseline), options.threshold))
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=_sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    _sys.exit(main())
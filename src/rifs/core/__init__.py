@@ -1,16 +1,63 @@
 """The core module for the rif package.
+
+Notes:
+    The attributes are imported on first access, like the rifs package. Importing rifs.core only loads
+    the modules of the attributes used.
 """
 
-from rifs.core import constants as core_constants
-from rifs.core.abstraction import AbstractRif, ProcessorRif
-from rifs.core.soumission import insert_job
-from rifs.core.validation import is_abstract_rif, is_soumission
+import importlib as _importlib
+import typing as _typing
+
+if _typing.TYPE_CHECKING:
+    from rifs.core import constants as core_constants
+    from rifs.core.abstraction import AbstractRif, ProcessorRif
+    from rifs.core.soumission import insert_job, insert_jobs
+    from rifs.core.validation import is_abstract_rif, is_soumission
 
 __all__ = [
     "AbstractRif",
     "core_constants",
     "insert_job",
+    "insert_jobs",
     "is_abstract_rif",
     "is_soumission",
     "ProcessorRif",
 ]
+
+
+# The module and the attribute name of each lazy attribute, None for the module itself
+_LAZY_ATTRIBUTES: _typing.Dict[str, _typing.Tuple[str, _typing.Optional[str]]] = {
+    "AbstractRif": ("rifs.core.abstraction", "AbstractRif"),
+    "core_constants": ("rifs.core.constants", None),
+    "insert_job": ("rifs.core.soumission", "insert_job"),
+    "insert_jobs": ("rifs.core.soumission", "insert_jobs"),
+    "is_abstract_rif": ("rifs.core.validation", "is_abstract_rif"),
+    "is_soumission": ("rifs.core.validation", "is_soumission"),
+    "ProcessorRif": ("rifs.core.abstraction", "ProcessorRif"),
+}
+
+
+def __getattr__(name: str) -> _typing.Any:
+    """Import the module of the lazy attribute on first access.
+
+    Args:
+        name (str): The attribute name.
+
+    Raises:
+        AttributeError: If the attribute isn't a lazy attribute.
+
+    Returns:
+        Any: The attribute.
+    """
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attribute = _LAZY_ATTRIBUTES[name]
+    module = _importlib.import_module(module_name)
+    value = module if attribute is None else getattr(module, attribute)
+    # Later accesses find the attribute without going through __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> _typing.List[str]:
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -3,25 +3,73 @@
 import abc as _abc
 import dataclasses as _dataclasses
 import datetime as _datetime
+import functools as _functools
 import os as _os
 import typing as _typing
 import uuid as _uuid
-import tempfile as _tempfile
 
-__all__ = ["AbstractRif", "ProcessorRif", "unique_temporary_directory"]
+# Package imports
+from rifs.core import constants as _constants
 
+__all__ = ["AbstractRif", "ProcessorRif", "session_temporary_directory", "unique_temporary_directory"]
 
-def unique_temporary_directory() -> str:
-    """Create a unique temporary directory.
+
+# The directories already created by this session, saves a round trip to the shared mount
+_CREATED_DIRECTORIES: _typing.Set[str] = set()
+
+
+def _make_directory(path: str) -> str:
+    """Create the directory once per session.
+
+    Args:
+        path (str): The directory path.
 
     Returns:
-        str: The full path to the unique temporary directory.
+        str: The directory path.
+    """
+    if path not in _CREATED_DIRECTORIES:
+        _os.makedirs(path, exist_ok=True)
+        _CREATED_DIRECTORIES.add(path)
+    return path
+
+
+@_functools.lru_cache(maxsize=None)
+def _session_temporary_path() -> str:
+    """Build the parent temporary directory path shared by every operation of this session.
+
+    Returns:
+        str: The full path to the session temporary directory.
     """
-    # root = _os.path.expandvars("/$DD_SHOWS_ROOT/$DD_SHOW/$DD_SEQ/$DD_SHOT/user/work.$USER/farm/rifs")
-    root = _os.path.expandvars("/vfx/wgid/tmp/farm/rifs/$USER")
+    root = _os.path.expandvars(_constants.RIF_TEMPORARY_ROOT)
     now = _datetime.datetime.now().strftime("%Y%m%d-%H%M")
-    full_path = _os.path.join(root, now, _uuid.uuid4().hex[:8])  # Create the directory
-    _os.makedirs(full_path, exist_ok=True)
+    return _os.path.join(root, now, _uuid.uuid4().hex[:8])
+
+
+def session_temporary_directory(create: bool = True) -> str:
+    """Return the parent temporary directory of this session.
+
+    Args:
+        create (bool, optional): Create the directory if it doesn't exist yet. Defaults to True.
+
+    Returns:
+        str: The full path to the session temporary directory.
+    """
+    path = _session_temporary_path()
+    return _make_directory(path) if create else path
+
+
+def unique_temporary_directory(create: bool = True) -> str:
+    """Create a unique temporary directory inside the session temporary directory.
+
+    Args:
+        create (bool, optional): Create the directory, otherwise only the path is returned. Defaults to True.
+
+    Returns:
+        str: The full path to the unique temporary directory.
+    """
+    full_path = _os.path.join(session_temporary_directory(create=create), _uuid.uuid4().hex[:8])
+    if create:
+        _make_directory(full_path)
 
     return full_path
 
@@ -37,9 +85,13 @@ class AbstractRif(_abc.ABC):
         name (str): The name of the operation.
         notes (str): The notes for the operation.
         depend_on (List[str]): The list of operations to depend on.
+        frame_depend_on (List[AbstractRif]): The list of operations to depend on frame by frame, once chunked
+                                             only the chunks rendering the same frames are waited on.
         soumission_kwargs (Dict[str, Any]): The keyword arguments for the operation which passed to the submission operation.
-        temporary_directory (str): The temporary directory for the operation.
+        temporary_directory (str): The temporary directory for the operation, only created on disk by
+                                   make_temporary_directory.
         namespace (str): The namespace for the operation.
+        outputs (List[str]): The files the operation writes, checked before skipping an up to date operation.
     """
 
     name: str = _dataclasses.field(default_factory=str, metadata={"kw_only": True})
@@ -47,27 +99,59 @@ class AbstractRif(_abc.ABC):
     depend_on: _typing.List["AbstractRif"] = _dataclasses.field(
         default_factory=list, repr=False, metadata={"kw_only": True}, hash=False
     )
+    frame_depend_on: _typing.List["AbstractRif"] = _dataclasses.field(
+        default_factory=list, repr=False, metadata={"kw_only": True, "exempt": True}, hash=False
+    )
     soumission_kwargs: _typing.Dict[str, _typing.Any] = _dataclasses.field(
         default_factory=dict, repr=False, metadata={"exempt": True}
     )
-    temporary_directory: str = _dataclasses.field(
-        default=unique_temporary_directory(), repr=False, metadata={"exempt": True}
-    )
+    temporary_directory: str = _dataclasses.field(default="", repr=False, metadata={"exempt": True})
     # The namespace allows us to explicitly define the namespace for the operation if constructing
     # from __main__.
     namespace: str = _dataclasses.field(default="", repr=False, metadata={"exempt": True, "kw_only": True})
+    outputs: _typing.List[str] = _dataclasses.field(
+        default_factory=list, repr=False, metadata={"exempt": True, "kw_only": True}
+    )
 
     command_override: _typing.ClassVar[list] = ["python"]
 
     def __post_init__(self) -> None:
         """Post init method for the AbstractRif class."""
-        self.temporary_directory = unique_temporary_directory()
+        self.temporary_directory = self.temporary_directory or unique_temporary_directory(create=False)
+
+    def make_temporary_directory(self) -> str:
+        """Create the temporary directory of the operation before the first write.
+
+        Returns:
+            str: The full path to the temporary directory.
+        """
+        # Subclasses overriding __post_init__ might not have a path yet
+        if not self.temporary_directory:
+            self.temporary_directory = unique_temporary_directory(create=False)
+        return _make_directory(self.temporary_directory)
 
     @_abc.abstractmethod
     def __call__(self, *args, **kwargs) -> _typing.Any:
         pass
 
 
+@_functools.lru_cache(maxsize=None)
+def _flag_plan(processor_class: type) -> _typing.Tuple[_typing.Tuple[str, str], ...]:
+    """Compile the command line flags declared in the field metadata of the processor class, once per class.
+
+    Args:
+        processor_class (type): The processor class.
+
+    Returns:
+        Tuple[Tuple[str, str], ...]: The field name and the flag of each flag field, in field order.
+    """
+    return tuple(
+        (processor_field.name, processor_field.metadata["flag"])
+        for processor_field in _dataclasses.fields(processor_class)
+        if "flag" in processor_field.metadata
+    )
+
+
 @_dataclasses.dataclass
 class ProcessorRif(AbstractRif):
     """The processor RIF object is a low level object that doesn't require the python executable framework.
@@ -77,12 +161,23 @@ class ProcessorRif(AbstractRif):
     Notes:
         Why is this different vs constructing the job object directly?
 
+        A boolean field with a flag in its metadata adds the flag to the command when enabled, see
+        command_flags.
+
     Attributes:
         command (str): The command to execute.
     """
 
     command: str = _dataclasses.field(default="", metadata={"kw_only": True})
 
+    def command_flags(self) -> _typing.Tuple[str, ...]:
+        """Return the flags of the enabled flag fields.
+
+        Returns:
+            Tuple[str, ...]: The flags, in field order.
+        """
+        return tuple(flag for field_name, flag in _flag_plan(type(self)) if getattr(self, field_name))
+
     def __call__(self, *args, **kwargs) -> _typing.Any:
         """The call method for the processor RIF object."""
         raise NotImplementedError("The processor RIF object is not callable.")
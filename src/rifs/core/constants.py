@@ -1,7 +1,22 @@
 """The internal constants for the rif module."""
 
 
-__all__ = ["RIF_SCRIPT_TEMPLATE"]
+__all__ = [
+    "RIF_LOCAL_STORE_ROOT",
+    "RIF_MANIFEST_VERSION",
+    "RIF_SCRIPT_STORE_ROOT",
+    "RIF_INSTRUMENTED_SCRIPT_TEMPLATE",
+    "RIF_SCRIPT_TEMPLATE",
+    "RIF_TEMPORARY_ROOT",
+]
+
+
+# RIF_TEMPORARY_ROOT = "/$DD_SHOWS_ROOT/$DD_SHOW/$DD_SEQ/$DD_SHOT/user/work.$USER/farm/rifs"
+RIF_TEMPORARY_ROOT = "/vfx/wgid/tmp/farm/rifs/$USER"
+# The content addressed store of the generated scripts, shared by every session of the user
+RIF_SCRIPT_STORE_ROOT = RIF_TEMPORARY_ROOT + "/store"
+# The stores kept on the workstation, like the memoized fingerprints
+RIF_LOCAL_STORE_ROOT = "~/.cache/rifs"
 
 
 RIF_SCRIPT_TEMPLATE = """
@@ -11,3 +26,22 @@ kwargs = {kwargs}
 
 {class_name}(**kwargs)()
 """
+
+# The sidecar path is the first argument, the script itself stays shareable in the store
+RIF_INSTRUMENTED_SCRIPT_TEMPLATE = """
+import sys
+
+from rifs.core.instrument import Recorder
+
+with Recorder(sys.argv[1] if len(sys.argv) > 1 else "", module="{module}", class_name="{class_name}") as recorder:
+    with recorder.phase("import"):
+        from {module} import {class_name}
+
+    kwargs = {kwargs}
+
+    with recorder.phase("call"):
+        {class_name}(**kwargs)()
+"""
+
+# Bump when the manifest layout read by rifs.core.runner changes
+RIF_MANIFEST_VERSION = 1
@@ -0,0 +1,113 @@
+"""The frames module parses and formats the frame range syntax shared by Nuke and the farm.
+
+Accepts:
+    'A'        single frame number A
+    'A-B'      all frames from A through B
+    'A-BxC'    every C'th frame from A to last one less or equal to B
+    'A B C'    a list of any of the above, separated by spaces or commas
+"""
+
+import re as _re
+import typing as _typing
+
+__all__ = ["chunk_frames", "format_frames", "frame_runs", "parse_frange"]
+
+
+_FRANGE_PART_PATTERN = _re.compile(r"^(-?\d+)(?:-(-?\d+)(?:x(\d+))?)?$")
+
+
+def parse_frange(frange: str) -> _typing.List[int]:
+    """Expand the frame range into the sorted unique frames.
+
+    Args:
+        frange (str): The frame range.
+
+    Raises:
+        ValueError: If a part of the frame range isn't valid.
+
+    Returns:
+        List[int]: The frames of the frame range.
+    """
+    frames: _typing.Set[int] = set()
+    for part in frange.replace(",", " ").split():
+        match = _FRANGE_PART_PATTERN.match(part)
+        if not match:
+            raise ValueError(f"Invalid frame range {part!r} in {frange!r}.")
+        first, last, step = match.groups()
+        last = last if last is not None else first
+        if int(last) < int(first) or step == "0":
+            raise ValueError(f"Invalid frame range {part!r} in {frange!r}.")
+        frames.update(range(int(first), int(last) + 1, int(step or 1)))
+
+    return sorted(frames)
+
+
+def frame_runs(frames: _typing.Iterable[int]) -> _typing.List[_typing.Tuple[int, int, int]]:
+    """Group the frames into runs with a constant step, a stepped pair is kept as two single frames.
+
+    Args:
+        frames (Iterable[int]): The frames.
+
+    Returns:
+        List[Tuple[int, int, int]]: The first frame, last frame and step of each run.
+    """
+    ordered = sorted(set(frames))
+    runs: _typing.List[_typing.Tuple[int, int, int]] = []
+    index = 0
+    while index < len(ordered):
+        first = ordered[index]
+        if index + 1 == len(ordered):
+            runs.append((first, first, 1))
+            break
+        step = ordered[index + 1] - first
+        end = index + 1
+        while end + 1 < len(ordered) and ordered[end + 1] - ordered[end] == step:
+            end += 1
+        # A stepped pair reads better as two frames
+        if step > 1 and end - index < 2:
+            runs.append((first, first, 1))
+            index += 1
+            continue
+        runs.append((first, ordered[end], step))
+        index = end + 1
+
+    return runs
+
+
+def format_frames(frames: _typing.Iterable[int]) -> str:
+    """Compact the frames into the frame range syntax, runs with a constant step become 'A-B' or 'A-BxC'.
+
+    Args:
+        frames (Iterable[int]): The frames.
+
+    Returns:
+        str: The space separated frame range.
+    """
+    parts = []
+    for first, last, step in frame_runs(frames):
+        if first == last:
+            parts.append(str(first))
+        elif step == 1:
+            parts.append(f"{first}-{last}")
+        else:
+            parts.append(f"{first}-{last}x{step}")
+
+    return " ".join(parts)
+
+
+def chunk_frames(frames: _typing.Sequence[int], batch_size: int) -> _typing.List[_typing.List[int]]:
+    """Split the frames into consecutive chunks of the batch size, the last chunk holds the remainder.
+
+    Args:
+        frames (Sequence[int]): The frames.
+        batch_size (int): The number of frames per chunk.
+
+    Raises:
+        ValueError: If the batch size isn't positive.
+
+    Returns:
+        List[List[int]]: The frames of each chunk.
+    """
+    if batch_size < 1:
+        raise ValueError(f"The batch size must be positive. Got {batch_size}.")
+    return [list(frames[index : index + batch_size]) for index in range(0, len(frames), batch_size)]
@@ -0,0 +1,155 @@
+"""The history module keeps the runtimes of finished jobs so the next submission can size its chunks and
+resources from what the same work took before, instead of guessing.
+
+The samples are keyed by the work they measure, for a nuke render the script path and the write nodes.
+Each sample holds the seconds per frame, the peak ram and the cpus of a finished job.
+
+Examples:
+    >>> history = RuntimeHistory()
+    >>> history.record("/path/to/comp.nk|Write1", seconds=600.0, frames=10, peak_ram=6200, cpus=4)
+    >>> estimate = history.estimate("/path/to/comp.nk|Write1")
+    >>> batch_size(estimate.frame_seconds, target_seconds=1800.0, frame_count=100)
+    30
+"""
+
+import dataclasses as _dataclasses
+import logging as _logging
+import math as _math
+import os as _os
+import statistics as _statistics
+import threading as _threading
+import time as _time
+import typing as _typing
+
+# Package imports
+from rifs.core import constants as _constants
+from rifs.core import store as _store
+
+__all__ = ["batch_size", "job_resources", "RuntimeEstimate", "RuntimeHistory"]
+
+
+_logger = _logging.getLogger("dd." + __name__)
+_logger.addHandler(_logging.NullHandler())
+
+
+@_dataclasses.dataclass
+class RuntimeEstimate:
+    """The runtime of a key estimated from its samples.
+
+    Attributes:
+        frame_seconds (float): The median seconds per frame.
+        peak_ram (int): The highest peak ram in MB, None if no sample measured it.
+        cpus (int): The cpus of the latest sample, None if no sample recorded them.
+        samples (int): The number of samples.
+    """
+
+    frame_seconds: float
+    peak_ram: _typing.Optional[int]
+    cpus: _typing.Optional[int]
+    samples: int
+
+
+class RuntimeHistory:
+    """The local store of the runtime samples, only the latest samples of each key are kept.
+
+    Attributes:
+        path (str): The json file of the store.
+        max_samples (int): The maximum number of samples kept per key.
+    """
+
+    def __init__(self, path: str = "", max_samples: int = 20) -> None:
+        self.path = path or _os.path.join(_os.path.expanduser(_constants.RIF_LOCAL_STORE_ROOT), "history.json")
+        self.max_samples = max_samples
+        self._lock = _threading.Lock()
+        self._samples: _typing.Dict[str, _typing.List[_typing.Dict[str, _typing.Any]]] = {}
+        self._samples.update(_store.load_json(self.path))
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(
+        self,
+        key: str,
+        seconds: float,
+        frames: int = 1,
+        peak_ram: _typing.Optional[int] = None,
+        cpus: _typing.Optional[int] = None,
+    ) -> bool:
+        """Record the runtime of a finished job.
+
+        Args:
+            key (str): The key of the measured work.
+            seconds (float): The seconds the job ran for.
+            frames (int, optional): The number of frames the job rendered. Defaults to 1.
+            peak_ram (int, optional): The peak ram of the job in MB. Defaults to None, not measured.
+            cpus (int, optional): The cpus of the job. Defaults to None, unknown.
+
+        Returns:
+            bool: True if the sample was recorded.
+        """
+        if frames < 1 or seconds <= 0:
+            _logger.warning("Not recording %s, %s seconds for %s frames isn't a runtime.", key, seconds, frames)
+            return False
+        sample = {"frame_seconds": seconds / frames, "peak_ram": peak_ram, "cpus": cpus, "time": _time.time()}
+        with self._lock:
+            samples = self._samples.setdefault(key, [])
+            samples.append(sample)
+            del samples[: -self.max_samples]
+            _store.save_json(self.path, self._samples)
+        return True
+
+    def estimate(self, key: str) -> _typing.Optional[RuntimeEstimate]:
+        """Estimate the runtime of the key from its samples.
+
+        Args:
+            key (str): The key of the measured work.
+
+        Returns:
+            RuntimeEstimate: The estimate, None if the key was never recorded.
+        """
+        with self._lock:
+            samples = list(self._samples.get(key, []))
+        if not samples:
+            return None
+        peak_rams = [sample["peak_ram"] for sample in samples if sample.get("peak_ram")]
+        cpus = [sample["cpus"] for sample in samples if sample.get("cpus")]
+        return RuntimeEstimate(
+            frame_seconds=_statistics.median(sample["frame_seconds"] for sample in samples),
+            peak_ram=max(peak_rams, default=None),
+            cpus=cpus[-1] if cpus else None,
+            samples=len(samples),
+        )
+
+
+def batch_size(frame_seconds: float, target_seconds: float, frame_count: int) -> int:
+    """Pick the number of frames per chunk that runs closest to the target task duration.
+
+    Args:
+        frame_seconds (float): The seconds per frame.
+        target_seconds (float): The target seconds per task.
+        frame_count (int): The number of frames to render.
+
+    Returns:
+        int: The number of frames per chunk, between 1 and the frame count.
+    """
+    if frame_seconds <= 0:
+        return max(frame_count, 1)
+    return max(1, min(frame_count, round(target_seconds / frame_seconds)))
+
+
+def job_resources(
+    estimate: RuntimeEstimate, headroom: float = 1.25, default_ram: int = 8000, default_cpus: int = 2
+) -> _typing.Tuple[int, int]:
+    """Pick the cpus and ram of a job from its estimate, the ram is rounded up to the next 500 MB.
+
+    Args:
+        estimate (RuntimeEstimate): The runtime estimate.
+        headroom (float, optional): The ratio of ram reserved over the peak ram. Defaults to 1.25.
+        default_ram (int, optional): The ram in MB without a measured peak. Defaults to 8000.
+        default_cpus (int, optional): The cpus without recorded cpus. Defaults to 2.
+
+    Returns:
+        Tuple[int, int]: The cpus and the ram in MB.
+    """
+    ram = default_ram if estimate.peak_ram is None else int(_math.ceil(estimate.peak_ram * headroom / 500.0) * 500)
+    return estimate.cpus or default_cpus, ram
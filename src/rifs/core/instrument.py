@@ -0,0 +1,175 @@
+"""The instrument module records the timings of an operation running on the farm into a json sidecar
+in the operation temporary directory, and aggregates the sidecars of a submission.
+
+Notes:
+    The recorder runs inside every instrumented farm task, keep it to the standard library.
+
+Examples:
+    >>> resolver = rifs.Constructor(operations, instrument=True).build().resolve()
+    >>> # Once the jobs finished
+    >>> summary = aggregate(collect(resolver))
+"""
+
+import contextlib as _contextlib
+import json as _json
+import os as _os
+import socket as _socket
+import time as _time
+import typing as _typing
+
+try:
+    import resource as _resource
+except ImportError:  # Windows
+    _resource = None  # type: ignore[assignment]
+
+__all__ = ["aggregate", "collect", "Recorder", "sidecar_path", "SIDECAR_NAME"]
+
+
+SIDECAR_NAME = "rif_stats.json"
+
+
+def sidecar_path(operation: _typing.Any) -> str:
+    """Return the sidecar path of the operation, inside its temporary directory.
+
+    Args:
+        operation (AbstractRif): The operation object.
+
+    Returns:
+        str: The path to the sidecar.
+    """
+    return _os.path.join(operation.temporary_directory, SIDECAR_NAME) if operation.temporary_directory else ""
+
+
+def _peak_rss_kb() -> _typing.Optional[int]:
+    """Return the peak resident memory of the process.
+
+    Returns:
+        int: The peak memory in KB, None if it can't be measured.
+    """
+    if _resource is None:
+        return None
+    return _resource.getrusage(_resource.RUSAGE_SELF).ru_maxrss
+
+
+class Recorder:
+    """Record the phases of a farm task and write them to the sidecar once the task exits.
+
+    Attributes:
+        path (str): The path to the sidecar, nothing is written without one.
+        stats (Dict[str, Any]): The recorded stats.
+
+    Examples:
+        >>> with Recorder("/path/to/rif_stats.json") as recorder:
+        ...     with recorder.phase("import"):
+        ...         from package.module import Operation
+        ...     with recorder.phase("call"):
+        ...         Operation()()
+    """
+
+    def __init__(self, path: str = "", **stats: _typing.Any) -> None:
+        self.path = path
+        self.stats: _typing.Dict[str, _typing.Any] = {"host": _socket.gethostname(), "pid": _os.getpid(), **stats}
+
+    @_contextlib.contextmanager
+    def phase(self, name: str) -> _typing.Iterator[None]:
+        """Record the wall and cpu seconds of a phase, even if it raises.
+
+        Args:
+            name (str): The name of the phase.
+        """
+        wall_start, cpu_start = _time.perf_counter(), _time.process_time()
+        try:
+            yield
+        finally:
+            self.stats[f"{name}_seconds"] = _time.perf_counter() - wall_start
+            self.stats[f"{name}_cpu_seconds"] = _time.process_time() - cpu_start
+
+    def __enter__(self) -> "Recorder":
+        self.stats["started"] = _time.time()
+        return self
+
+    def __exit__(self, exception_type: _typing.Any, exception: _typing.Any, _: _typing.Any) -> bool:
+        if exception_type is None:
+            exit_status = 0
+        elif isinstance(exception, SystemExit):
+            exit_status = exception.code if isinstance(exception.code, int) else int(exception.code is not None)
+        else:
+            exit_status = 1
+        self.stats["exit_status"] = exit_status
+        self.stats["peak_rss_kb"] = _peak_rss_kb()
+        self.write()
+        # Let the exception through, the farm still needs the failure
+        return False
+
+    def write(self) -> bool:
+        """Write the stats to the sidecar.
+
+        Returns:
+            bool: True if the sidecar was written.
+        """
+        if not self.path:
+            return False
+        try:
+            _os.makedirs(_os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as open_sidecar_file:
+                _json.dump(self.stats, open_sidecar_file)
+        except OSError:
+            # The stats must never fail the operation itself
+            return False
+        return True
+
+
+def collect(resolver: _typing.Iterable[_typing.Any]) -> _typing.List[_typing.Dict[str, _typing.Any]]:
+    """Read the sidecars written by the operations of a submission, operations without one are left out.
+
+    Args:
+        resolver (Resolver): The resolver of the submission.
+
+    Returns:
+        List[Dict[str, Any]]: The stats of each operation, with the grouping name.
+    """
+    records = []
+    for grouping in resolver:
+        path = sidecar_path(grouping.operation) if hasattr(grouping.operation, "temporary_directory") else ""
+        try:
+            with open(path, "r", encoding="utf-8") as open_sidecar_file:
+                record = _json.load(open_sidecar_file)
+        except (OSError, ValueError):
+            continue
+        record["name"] = grouping.name()
+        records.append(record)
+    return records
+
+
+def _total_seconds(record: _typing.Dict[str, _typing.Any]) -> float:
+    """Return the seconds of the import and the call of an operation.
+
+    Args:
+        record (Dict[str, Any]): The stats of the operation.
+
+    Returns:
+        float: The total seconds.
+    """
+    return record.get("import_seconds", 0.0) + record.get("call_seconds", 0.0)
+
+
+def aggregate(records: _typing.List[_typing.Dict[str, _typing.Any]], top: int = 10) -> _typing.Dict[str, _typing.Any]:
+    """Sum up the stats of a submission, and rank the operations that took the most time.
+
+    Args:
+        records (List[Dict[str, Any]]): The stats of each operation, from collect.
+        top (int, optional): The number of operations ranked. Defaults to 10.
+
+    Returns:
+        Dict[str, Any]: The totals and the slowest operations.
+    """
+    peak_rss = [record["peak_rss_kb"] for record in records if record.get("peak_rss_kb") is not None]
+    return {
+        "operations": len(records),
+        "failed": sum(1 for record in records if record.get("exit_status")),
+        "import_seconds": sum(record.get("import_seconds", 0.0) for record in records),
+        "call_seconds": sum(record.get("call_seconds", 0.0) for record in records),
+        "call_cpu_seconds": sum(record.get("call_cpu_seconds", 0.0) for record in records),
+        "peak_rss_kb": max(peak_rss, default=None),
+        "slowest": sorted(records, key=_total_seconds, reverse=True)[:top],
+    }
@@ -0,0 +1,156 @@
+"""The memo module lets the constructor skip operations that are already up to date.
+
+An operation is fingerprinted from its class, its non exempt fields and the mtime and size of its
+declared input files. Once the operation succeeded, its outputs are recorded against the fingerprint.
+Building the same operation again, with unchanged inputs and the outputs still on disk, skips it.
+The local scheduler records the operations that succeeded, a farm submission records them with
+Constructor.record_memo once its jobs finished.
+
+Notes:
+    Declare the input files with the {"input": True} field metadata, the outputs with the outputs field.
+"""
+
+import collections as _collections
+import dataclasses as _dataclasses
+import hashlib as _hashlib
+import json as _json
+import logging as _logging
+import os as _os
+import threading as _threading
+import time as _time
+import typing as _typing
+
+# Package imports
+from rifs.core import constants as _constants
+from rifs.core import store as _store
+
+__all__ = ["fingerprint", "MemoStore"]
+
+
+_logger = _logging.getLogger("dd." + __name__)
+_logger.addHandler(_logging.NullHandler())
+
+
+def _input_stats(value: _typing.Any) -> _typing.List[_typing.Any]:
+    """Stat the input files of a field, missing files are part of the fingerprint too.
+
+    Args:
+        value (Any): The path or the list of paths.
+
+    Returns:
+        List[Any]: The path, mtime and size of each file.
+    """
+    paths = value if isinstance(value, (list, tuple)) else [value]
+    stats: _typing.List[_typing.Any] = []
+    for path in paths:
+        try:
+            path_stat = _os.stat(str(path))
+            stats.append([str(path), path_stat.st_mtime_ns, path_stat.st_size])
+        except OSError:
+            stats.append([str(path), None, None])
+    return stats
+
+
+def fingerprint(operation: _typing.Any) -> str:
+    """Fingerprint the operation from its class, non exempt fields and input files.
+
+    Args:
+        operation (AbstractRif): The operation object.
+
+    Returns:
+        str: The hex digest of the fingerprint.
+    """
+    values: _typing.Dict[str, _typing.Any] = {}
+    inputs: _typing.Dict[str, _typing.Any] = {}
+    for field in _dataclasses.fields(operation):
+        # The dependencies and the derived fields don't change what the operation writes
+        if field.metadata.get("exempt") or field.hash is False or not field.init:
+            continue
+        value = getattr(operation, field.name)
+        values[field.name] = value
+        if field.metadata.get("input") and value:
+            inputs[field.name] = _input_stats(value)
+
+    operation_class = type(operation)
+    payload = {
+        "class": f"{operation_class.__module__}.{operation_class.__qualname__}",
+        "fields": values,
+        "inputs": inputs,
+    }
+    serialized = _json.dumps(payload, sort_keys=True, default=repr)
+    return _hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+class MemoStore:
+    """The local store of the fingerprints and the outputs they wrote, the least recently recorded entries
+    are evicted past the maximum. A lookup doesn't write the store, so it doesn't keep an entry.
+
+    Attributes:
+        path (str): The json file of the store.
+        max_entries (int): The maximum number of fingerprints kept.
+
+    Examples:
+        >>> constructor = rifs.Constructor(operations, memo=MemoStore())
+        >>> constructor.submit()
+        >>> # Once the farm jobs finished
+        >>> constructor.record_memo()
+    """
+
+    def __init__(self, path: str = "", max_entries: int = 2048) -> None:
+        self.path = path or _os.path.join(_os.path.expanduser(_constants.RIF_LOCAL_STORE_ROOT), "memo.json")
+        self.max_entries = max_entries
+        self._lock = _threading.Lock()
+        self._entries: _typing.OrderedDict[str, _typing.Dict[str, _typing.Any]] = _collections.OrderedDict()
+        self._entries.update(_store.load_json(self.path))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, operation: _typing.Any) -> _typing.Optional[_typing.List[str]]:
+        """Return the outputs recorded for the operation fingerprint.
+
+        Args:
+            operation (AbstractRif): The operation object.
+
+        Returns:
+            List[str]: The recorded outputs, None if the fingerprint was never recorded.
+        """
+        operation_fingerprint = fingerprint(operation)
+        with self._lock:
+            entry = self._entries.get(operation_fingerprint)
+        return None if entry is None else list(entry["outputs"])
+
+    def is_up_to_date(self, operation: _typing.Any) -> bool:
+        """Check if the operation already ran with the same fields and inputs, and its outputs still exist.
+
+        Args:
+            operation (AbstractRif): The operation object.
+
+        Returns:
+            bool: True if the operation can be skipped.
+        """
+        outputs = self.lookup(operation)
+        return bool(outputs) and all(_os.path.exists(output) for output in outputs)
+
+    def record(self, operation: _typing.Any, outputs: _typing.Optional[_typing.List[str]] = None) -> str:
+        """Record the outputs of a successful operation against its fingerprint.
+
+        Args:
+            operation (AbstractRif): The operation object.
+            outputs (List[str], optional): The files the operation wrote. Defaults to the operation outputs.
+
+        Returns:
+            str: The fingerprint of the operation.
+        """
+        operation_fingerprint = fingerprint(operation)
+        outputs = list(outputs if outputs is not None else getattr(operation, "outputs", []))
+        if not outputs:
+            _logger.warning("Not recording %s, it declares no outputs to check.", type(operation).__name__)
+            return operation_fingerprint
+        with self._lock:
+            self._entries[operation_fingerprint] = {"outputs": outputs, "time": _time.time()}
+            self._entries.move_to_end(operation_fingerprint)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            _store.save_json(self.path, self._entries)
+        return operation_fingerprint
@@ -0,0 +1,73 @@
+"""The pack runner executes the commands of the operations packed into a single farm job, one after
+another or on a small pool.
+
+The pack file is a json object with the commands and how to run them:
+    commands   the argv of each packed operation
+    workers    the number of commands run at once, 1 runs them in order
+
+Every command runs even if another one failed, the packed operations never depend on each other.
+
+Notes:
+    The runner is executed as a plain script on the farm, keep it to the standard library.
+
+Examples:
+    $ python pack_runner.py /vfx/wgid/tmp/farm/rifs/$USER/20240101-1200/1a2b3c4d/packs/pack_5e6f7a8b.json
+"""
+
+import json as _json
+import subprocess as _subprocess
+import sys as _sys
+import typing as _typing
+
+from concurrent import futures as _futures
+
+__all__ = ["run"]
+
+
+def _run_command(index: int, count: int, command: _typing.List[str]) -> int:
+    """Run a packed command, its output goes straight to the job logs.
+
+    Args:
+        index (int): The position of the command in the pack.
+        count (int): The number of commands in the pack.
+        command (List[str]): The command.
+
+    Returns:
+        int: The exit status of the command.
+    """
+    print(f"[pack {index + 1}/{count}] {' '.join(command)}", flush=True)
+    try:
+        returncode = _subprocess.call(command)
+    except OSError as error:
+        print(f"[pack {index + 1}/{count}] {error}", file=_sys.stderr, flush=True)
+        return 127
+    print(f"[pack {index + 1}/{count}] exited with {returncode}", flush=True)
+    return returncode
+
+
+def run(pack_path: str) -> int:
+    """Run the commands of the pack file.
+
+    Args:
+        pack_path (str): The path to the pack file.
+
+    Returns:
+        int: The exit status of the pack, 0 if every command succeeded.
+    """
+    with open(pack_path, "r", encoding="utf-8") as open_pack_file:
+        pack = _json.load(open_pack_file)
+    commands = pack["commands"]
+    count = len(commands)
+
+    if pack.get("workers", 1) <= 1:
+        returncodes = [_run_command(index, count, command) for index, command in enumerate(commands)]
+    else:
+        with _futures.ThreadPoolExecutor(max_workers=pack["workers"]) as executor:
+            returncodes = list(executor.map(_run_command, range(count), [count] * count, commands))
+    return 1 if any(returncodes) else 0
+
+
+if __name__ == "__main__":
+    if len(_sys.argv) != 2:
+        _sys.exit(f"Usage: {_sys.argv[0]} <pack>")
+    _sys.exit(run(_sys.argv[1]))
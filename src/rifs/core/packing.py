@@ -0,0 +1,335 @@
+"""The packing module merges the groupings of a resolved submission into fewer jobs, so the farm
+schedules a handful of jobs instead of one per operation.
+
+pack merges the small independent operations into array style jobs. Sibling groupings are packed
+together when they depend on exactly the same jobs and ask for the same resources. The packed job runs
+the pack runner, which executes the commands of its operations in sequence or on a small pool. Jobs with
+a frame range are renders and are never packed.
+
+fuse collapses the linear chains of python operations, where each step is the only dependent of the
+previous one, into a single job. The shared runner calls the steps back to back in one interpreter.
+
+Examples:
+    >>> resolver = rifs.Constructor(operations).build().resolve()
+    >>> packed = pack(fuse(resolver), max_size=50, workers=4)
+"""
+
+import dataclasses as _dataclasses
+import json as _json
+import logging as _logging
+import os as _os
+import typing as _typing
+import uuid as _uuid
+
+# Package imports
+from rifs.core import pack_runner as _pack_runner
+from rifs.core import runner as _runner
+from rifs.core.abstraction import AbstractRif as _AbstractRif, ProcessorRif as _ProcessorRif
+from rifs.core.abstraction import session_temporary_directory as _session_temporary_directory
+from rifs.core.instrument import sidecar_path as _sidecar_path
+from rifs.core.resolver import Grouping as _Grouping, Resolver as _Resolver
+from rifs.core.soumission import _Job, insert_job as _insert_job
+from rifs.core.transmission import generate_manifest as _generate_manifest, operation_entry as _operation_entry
+
+__all__ = ["fuse", "pack", "PackedOperation"]
+
+
+_logger = _logging.getLogger("dd." + __name__)
+_logger.addHandler(_logging.NullHandler())
+
+# The job attributes that must match for groupings to share a job
+_RESOURCE_ATTRIBUTES = ("show", "activity", "job_class_type", "ram", "cpus", "honor_cores", "auto_dump")
+
+
+@_dataclasses.dataclass
+class PackedOperation(_ProcessorRif):
+    """The operation standing in for the operations merged into one job.
+
+    Attributes:
+        operations (List[AbstractRif]): The merged operations, in the order they run.
+    """
+
+    operations: _typing.List[_AbstractRif] = _dataclasses.field(
+        default_factory=list, repr=False, metadata={"exempt": True, "kw_only": True}
+    )
+
+
+def write_pack(commands: _typing.List[_typing.List[str]], workers: int = 1) -> str:
+    """Write the pack file read by the pack runner into the session temporary directory.
+
+    Args:
+        commands (List[List[str]]): The command of each merged operation.
+        workers (int, optional): The number of commands run at once. Defaults to 1, in order.
+
+    Returns:
+        str: The path to the pack file.
+    """
+    pack_directory = _os.path.join(_session_temporary_directory(), "packs")
+    _os.makedirs(pack_directory, exist_ok=True)
+    pack_path = _os.path.join(pack_directory, f"pack_{_uuid.uuid4().hex[:8]}.json")
+    with open(pack_path, "w", encoding="utf-8") as open_pack_file:
+        _json.dump({"commands": commands, "workers": workers}, open_pack_file)
+    return pack_path
+
+
+def merged_grouping(
+    groupings: _typing.List["_Grouping"], name: str, command: _typing.List[str], workers: int = 1
+) -> "_Grouping":
+    """Create the grouping whose job runs the jobs of the groupings with a single command.
+
+    Notes:
+        The job takes the attributes of the first grouping, the largest ram and cpus of the groupings
+        times the number of them run at once.
+
+    Args:
+        groupings (List[Grouping]): The groupings to merge, in the order they run.
+        name (str): The name of the merged operation.
+        command (List[str]): The command running the groupings.
+        workers (int, optional): The number of groupings run at once. Defaults to 1, in order.
+
+    Returns:
+        Grouping: The merged grouping, its job depends on the jobs the first grouping depends on.
+    """
+    first_job = groupings[0].job
+    operation = PackedOperation(
+        name=name,
+        notes=", ".join(grouping.name() for grouping in groupings),
+        operations=[grouping.operation for grouping in groupings],
+        command=command,
+    )
+    soumission_kwargs = {attribute: getattr(first_job, attribute) for attribute in _RESOURCE_ATTRIBUTES}
+    soumission_kwargs.update(
+        job_name=first_job.job_name,
+        env=dict(first_job.env),
+        outputImage=first_job.env.get("outputImage", ""),
+        ram=max(grouping.job.ram for grouping in groupings) * workers,
+        cpus=max(grouping.job.cpus for grouping in groupings) * workers,
+    )
+    job = _insert_job(operation, "", **soumission_kwargs)
+    job.depend_on = list(first_job.depend_on)
+    return _Grouping(operation, job)
+
+
+def rewrite_depend_on(resolver: "_Resolver", replacements: _typing.Dict[int, _typing.Any]) -> None:
+    """Point the job depend_on at the merged jobs instead of the jobs they replaced.
+
+    Args:
+        resolver (Resolver): The resolver with the merged groupings.
+        replacements (Dict[int, Job]): The merged job, keyed by the identity of each job it replaced.
+    """
+    for grouping in resolver:
+        depend_on = getattr(grouping.job, "depend_on", None) or []
+        if not any(id(job) in replacements for job in depend_on):
+            continue
+        rewritten: _typing.Dict[int, _typing.Any] = {}
+        for job in depend_on:
+            job = replacements.get(id(job), job)
+            rewritten.setdefault(id(job), job)
+        grouping.job.depend_on = list(rewritten.values())
+
+
+def _pack_key(grouping: "_Grouping") -> _typing.Optional[_typing.Tuple[_typing.Any, ...]]:
+    """Return the key shared by the groupings that can be packed together.
+
+    Args:
+        grouping (Grouping): The grouping object.
+
+    Returns:
+        Tuple[Any, ...]: The identities of the jobs it depends on and its resources, None if it can't be packed.
+    """
+    job = grouping.job
+    if getattr(job, "frame_range", "") or not getattr(job, "command", None):
+        return None
+    parents = frozenset(id(depend_on) for depend_on in getattr(job, "depend_on", None) or [])
+    resources = tuple(getattr(job, attribute, None) for attribute in _RESOURCE_ATTRIBUTES)
+    return parents, resources, tuple(sorted((key, repr(value)) for key, value in job.env.items()))
+
+
+def pack(resolver: "_Resolver", max_size: int = 50, workers: int = 1) -> "_Resolver":
+    """Pack the sibling groupings of the resolved resolver into array style jobs.
+
+    Args:
+        resolver (Resolver): The resolved resolver.
+        max_size (int, optional): The maximum number of operations per job. Defaults to 50.
+        workers (int, optional): The number of operations a packed job runs at once. Defaults to 1, in order.
+
+    Returns:
+        Resolver: The resolved resolver with the packed groupings, finding a packed operation or job finds
+                  its packed grouping.
+    """
+    siblings: _typing.Dict[_typing.Tuple[_typing.Any, ...], _typing.List[_Grouping]] = {}
+    for grouping in resolver:
+        key = _pack_key(grouping)
+        if key is not None:
+            siblings.setdefault(key, []).append(grouping)
+
+    # The packs start at their first member, every member has the same parents so the order holds
+    packs_by_first: _typing.Dict[int, _typing.List[_Grouping]] = {}
+    packed: _typing.Set[int] = set()
+    for members in siblings.values():
+        for start in range(0, len(members), max(max_size, 2)):
+            members_pack = members[start : start + max(max_size, 2)]
+            if len(members_pack) < 2:
+                continue
+            packs_by_first[members_pack[0].operation_id] = members_pack
+            packed.update(member.operation_id for member in members_pack)
+
+    packed_resolver = _Resolver()
+    replacements: _typing.Dict[int, _typing.Any] = {}
+    for grouping in resolver:
+        if grouping.operation_id not in packed:
+            packed_resolver._add(grouping)  # pylint: disable=protected-access
+            continue
+        members_pack = packs_by_first.get(grouping.operation_id)
+        if members_pack is None:
+            continue
+        pack_workers = max(1, min(workers, len(members_pack)))
+        pack_path = write_pack([list(member.job.command) for member in members_pack], pack_workers)
+        pack_command = _ProcessorRif.command_override + [_pack_runner.__file__, pack_path]
+        pack_grouping = merged_grouping(members_pack, f"pack of {len(members_pack)}", pack_command, pack_workers)
+        packed_resolver.merge(pack_grouping, members_pack)
+        replacements.update((id(member.job), pack_grouping.job) for member in members_pack)
+
+    rewrite_depend_on(packed_resolver, replacements)
+    _logger.info("Packed %s groupings into %s jobs.", len(packed), len(packs_by_first))
+    return packed_resolver
+
+
+def _resolved_parents(resolver: "_Resolver") -> _typing.Dict[int, _typing.List["_Grouping"]]:
+    """Find the groupings each grouping depends on, from the resolved job depend_on.
+
+    Args:
+        resolver (Resolver): The resolved resolver.
+
+    Returns:
+        Dict[int, List[Grouping]]: The parent groupings, keyed by operation id.
+    """
+    parents: _typing.Dict[int, _typing.List[_Grouping]] = {}
+    for grouping in resolver:
+        depend_on_groupings = (
+            resolver.find(operation=depend_on, job=depend_on)
+            for depend_on in getattr(grouping.job, "depend_on", None) or []
+        )
+        unique = {parent.operation_id: parent for parent in depend_on_groupings if parent is not None}
+        parents[grouping.operation_id] = list(unique.values())
+    return parents
+
+
+def _round_trips(operation: "_AbstractRif") -> bool:
+    """Check if the operation kwargs come back unchanged from the json manifest.
+
+    Args:
+        operation (AbstractRif): The operation object.
+
+    Returns:
+        bool: False if a kwarg can't be serialized or changes type, like a tuple loaded back as a list.
+    """
+    kwargs = _operation_entry(operation)["kwargs"]
+    try:
+        return _json.loads(_json.dumps(kwargs)) == kwargs
+    except (TypeError, ValueError):
+        return False
+
+
+def _fusable(grouping: "_Grouping") -> bool:
+    """Check if the grouping is a python operation that can run inside a fused chain.
+
+    Args:
+        grouping (Grouping): The grouping object.
+
+    Returns:
+        bool: True if the operation runs with the default interpreter and can be rebuilt from a manifest.
+    """
+    operation = grouping.operation
+    return (
+        isinstance(operation, _AbstractRif)
+        and not isinstance(operation, (_ProcessorRif, _Job))
+        and type(operation).command_override == _AbstractRif.command_override
+        and not getattr(grouping.job, "frame_range", "")
+        and _round_trips(operation)
+    )
+
+
+def fuse(resolver: "_Resolver", instrument: bool = False) -> "_Resolver":
+    """Fuse the linear chains of python operations of the resolved resolver into single jobs.
+
+    Notes:
+        B is fused after A when A is the only grouping B depends on, B is the only grouping depending
+        on A and both jobs have the same env. The steps run back to back in one interpreter through the shared runner, a failed step
+        stops the chain.
+
+    Args:
+        resolver (Resolver): The resolved resolver.
+        instrument (bool, optional): Record the timings of each chain into the sidecar of its fused
+                                     operation. Defaults to False.
+
+    Returns:
+        Resolver: The resolved resolver with the fused groupings, finding a fused operation or job finds
+                  its fused grouping.
+    """
+    parents = _resolved_parents(resolver)
+    children: _typing.Dict[int, _typing.List[_Grouping]] = {grouping.operation_id: [] for grouping in resolver}
+    for grouping in resolver:
+        for parent in parents[grouping.operation_id]:
+            children[parent.operation_id].append(grouping)
+
+    fusable = {grouping.operation_id: _fusable(grouping) for grouping in resolver}
+
+    def next_step(grouping: "_Grouping") -> _typing.Optional["_Grouping"]:
+        following = children[grouping.operation_id]
+        if len(following) != 1 or not fusable[grouping.operation_id] or not fusable[following[0].operation_id]:
+            return None
+        # The fused job keeps the env of the first step only
+        if following[0].job.env != grouping.job.env:
+            return None
+        return following[0] if len(parents[following[0].operation_id]) == 1 else None
+
+    # The chains start at the steps that don't follow another step
+    followers = {step.operation_id for step in map(next_step, resolver) if step is not None}
+    chains: _typing.List[_typing.List[_Grouping]] = []
+    for grouping in resolver:
+        if grouping.operation_id in followers:
+            continue
+        chain = [grouping]
+        while True:
+            step = next_step(chain[-1])
+            if step is None:
+                break
+            chain.append(step)
+        if len(chain) > 1:
+            chains.append(chain)
+    if not chains:
+        return resolver
+
+    # One manifest holds the steps of every chain
+    manifest_operations = {}
+    chain_operation_ids = []
+    for chain in chains:
+        operation_ids = [str(len(manifest_operations) + index) for index in range(len(chain))]
+        manifest_operations.update(zip(operation_ids, (step.operation for step in chain)))
+        chain_operation_ids.append(",".join(operation_ids))
+    manifest_path = _generate_manifest(manifest_operations)
+
+    chains_by_head = {
+        chain[0].operation_id: (chain, operation_ids) for chain, operation_ids in zip(chains, chain_operation_ids)
+    }
+    fused = {step.operation_id for chain in chains for step in chain}
+    fused_resolver = _Resolver()
+    replacements: _typing.Dict[int, _typing.Any] = {}
+    for grouping in resolver:
+        if grouping.operation_id not in fused:
+            fused_resolver._add(grouping)  # pylint: disable=protected-access
+            continue
+        if grouping.operation_id not in chains_by_head:
+            continue
+        chain, operation_ids = chains_by_head[grouping.operation_id]
+        chain_command = _AbstractRif.command_override + [_runner.__file__, manifest_path, operation_ids]
+        chain_grouping = merged_grouping(chain, f"chain of {len(chain)}", chain_command)
+        if instrument:
+            chain_grouping.job.command.append(_sidecar_path(chain_grouping.operation))
+        fused_resolver.merge(chain_grouping, chain)
+        replacements.update((id(step.job), chain_grouping.job) for step in chain)
+
+    rewrite_depend_on(fused_resolver, replacements)
+    _logger.info("Fused %s groupings into %s chains.", len(fused), len(chains))
+    return fused_resolver
@@ -19,27 +19,100 @@
 to the corresponding jobs.
 """
 
+import functools as _functools
+import heapq as _heapq
+import itertools as _itertools
+import logging as _logging
 import typing as _typing
 
-from collections import namedtuple as _namedtuple
+from collections import deque as _deque
 from dataclasses import dataclass as _dataclass, field as _field
 
 # Package imports
 from rifs.core import AbstractRif as _AbstractRif
+from rifs.core import frames as _frames
 
 try:
     from submission.types.jobs.job import Job as _Job
 except ImportError:
     _Job = None
 
-__all__ = ["Grouping"]
+__all__ = ["Grouping", "ResolverCycleError"]
 
 
-class Grouping(_namedtuple("Grouping", ["operation", "job"])):
-    """The grouping class takes an operation and a job and groups them together."""
+_logger = _logging.getLogger("dd." + __name__)
+_logger.addHandler(_logging.NullHandler())
 
-    operator: "_AbstractRif"
-    job: "_Job"
+# Process wide sequence for the grouping operation ids, next() on a count is atomic
+_OPERATION_IDS = _itertools.count(1)
+
+
+@_functools.lru_cache(maxsize=4096)
+def _frame_set(frange: str) -> _typing.FrozenSet[int]:
+    """Expand the frame range once, the chunks of a submission are compared many times.
+
+    Notes:
+        Nuke accepts frame ranges the strict parser rejects, those are passed through to -F untouched
+        and have no frames here.
+
+    Args:
+        frange (str): The frame range.
+
+    Returns:
+        FrozenSet[int]: The frames of the frame range, empty if it can't be parsed.
+    """
+    try:
+        return frozenset(_frames.parse_frange(frange))
+    except ValueError:
+        _logger.debug("Can't parse the frame range %r, depending on the whole operation.", frange)
+        return frozenset()
+
+
+class ResolverCycleError(ValueError):
+    """Raised when the depend_on graph of the groupings contains a cycle.
+
+    Attributes:
+        cycle (List[Grouping]): The groupings forming the cycle, the first grouping is repeated at the end.
+    """
+
+    def __init__(self, cycle: _typing.List["Grouping"]) -> None:
+        self.cycle = cycle
+        super().__init__("Circular depend_on detected: " + " -> ".join(grouping.name() for grouping in cycle))
+
+
+class Grouping:
+    """The grouping class takes an operation and a job and groups them together.
+
+    Notes:
+        The operation id is assigned once when the grouping is injected and never changes, the
+        hash and equality only use the id so they don't walk the dataclass fields.
+
+    Attributes:
+        operation (AbstractRif): The operation object.
+        job (Job): The job object.
+        operation_id (int): The unique id of the operation for this session.
+    """
+
+    __slots__ = ("operation", "job", "operation_id")
+
+    def __init__(self, operation: "_AbstractRif", job: "_Job", operation_id: _typing.Optional[int] = None) -> None:
+        self.operation = operation
+        self.job = job
+        self.operation_id: int = next(_OPERATION_IDS) if operation_id is None else operation_id
+
+    def __repr__(self) -> str:
+        return f"Grouping(operation_id={self.operation_id}, operation={self.operation!r}, job={self.job!r})"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Grouping):
+            return NotImplemented
+        return self.operation_id == other.operation_id
+
+    def __lt__(self, other: "Grouping") -> bool:
+        # Keeps the Resolver dataclass ordering working
+        if not isinstance(other, Grouping):
+            return NotImplemented
+        return self.operation_id < other.operation_id
 
     def __hash__(self) -> int:
         """Hash the grouping object.
@@ -47,7 +120,16 @@ class Grouping(_namedtuple("Grouping", ["operation", "job"])):
         Returns:
             int: The hash value of the grouping object.
         """
-        return hash(str(self.operation) + str(self.job))
+        return hash(self.operation_id)
+
+    def __iter__(self) -> _typing.Iterator[_typing.Any]:
+        """Unpack the grouping into the operation and the job.
+
+        Yields:
+            Any: The operation then the job.
+        """
+        yield self.operation
+        yield self.job
 
     def has_depend_on(self) -> bool:
         """Check if the operation has depend_on attributes.
@@ -55,7 +137,13 @@ class Grouping(_namedtuple("Grouping", ["operation", "job"])):
         Returns:
             bool: True if the operation has depend_on.
         """
-        return bool(self.operation.depend_on) or bool(self.job.depend_on)
+        return any(
+            (
+                getattr(self.operation, "depend_on", None),
+                getattr(self.operation, "frame_depend_on", None),
+                getattr(self.job, "depend_on", None),
+            )
+        )
 
     def name(self) -> str:
         """Return the name of the grouping.
@@ -63,14 +151,39 @@ class Grouping(_namedtuple("Grouping", ["operation", "job"])):
         Returns:
             str: The name of the grouping.
         """
-        return f"{self.operation.name} - {self.job.job_name}"
+        # A raw job injected on its own is also the operation and has no name
+        return f"{getattr(self.operation, 'name', '')} - {getattr(self.job, 'job_name', '')}"
 
 
 @_dataclass(eq=True, order=True)
 class Resolver:
-    """The resolver class for the RIFs package."""
+    """The resolver class for the RIFs package.
+
+    Notes:
+        The operations and jobs are indexed by identity, the dataclass equality compares every field
+        which is far too slow to look up thousands of groupings. Add the groupings with inject so the
+        indexes stay up to date.
+
+        The chunks of an operation are indexed by their chunk_source. Depending on the chunked operation
+        depends on all of its chunks, with frame_depend_on a chunk only depends on the upstream chunks
+        rendering the same frames.
+
+    Attributes:
+        groupings (List[Grouping]): The grouping objects in injection order.
+    """
 
     groupings: _typing.List[Grouping] = _field(default_factory=list)
+    _operation_index: _typing.Dict[int, Grouping] = _field(default_factory=dict, init=False, repr=False, compare=False)
+    _job_index: _typing.Dict[int, Grouping] = _field(default_factory=dict, init=False, repr=False, compare=False)
+    _chunk_index: _typing.Dict[int, _typing.List[Grouping]] = _field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _skipped: _typing.Set[int] = _field(default_factory=set, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        """Index the groupings passed to the constructor."""
+        for grouping in self.groupings:
+            self._index(grouping)
 
     def __iter__(self) -> _typing.Iterator["Grouping"]:
         """Iterate over the resolver.
@@ -90,12 +203,82 @@ class Resolver:
             bool: True if the items are in the resolver.
         """
         # The comparable items are in either grouping, operations or jobs
-        in_operations = all(item in self.only_operations() for item in items)
-        in_jobs = all(item in self.only_jobs() for item in items)
-        in_grouping = all(item in self.groupings for item in items)
+        in_operations = all(id(item) in self._operation_index for item in items)
+        in_jobs = all(id(item) in self._job_index for item in items)
+        in_grouping = all(self._has_grouping(item) for item in items)
 
         return any([in_operations, in_jobs, in_grouping])
 
+    def _has_grouping(self, item: _typing.Any) -> bool:
+        """Check if the exact grouping, by operation id, is in the resolver.
+
+        Args:
+            item (Any): The object to check.
+
+        Returns:
+            bool: True if the grouping is in the resolver.
+        """
+        if not isinstance(item, Grouping):
+            return False
+        return self._operation_index.get(id(item.operation)) == item
+
+    def _index(self, grouping: "Grouping") -> None:
+        """Add the grouping to the operation and job indexes, the first injected grouping wins.
+
+        Args:
+            grouping (Grouping): The grouping object.
+        """
+        self._operation_index.setdefault(id(grouping.operation), grouping)
+        self._job_index.setdefault(id(grouping.job), grouping)
+        chunk_source = getattr(grouping.operation, "chunk_source", None)
+        if chunk_source is not None:
+            self._chunk_index.setdefault(id(chunk_source), []).append(grouping)
+
+    def _lookup(self, item: _typing.Any) -> _typing.Optional["Grouping"]:
+        """Find the grouping from an item that is either an operation or a job.
+
+        Args:
+            item (Any): The operation or job object.
+
+        Returns:
+            Grouping: The grouping object.
+        """
+        return self._operation_index.get(id(item)) or self._job_index.get(id(item))
+
+    def _depend_on_groupings(self, grouping: "Grouping") -> _typing.Tuple[_typing.List["Grouping"], bool]:
+        """Collect the groupings the grouping depends on, from both the depend_on and the frame_depend_on.
+
+        Args:
+            grouping (Grouping): The grouping object.
+
+        Returns:
+            Tuple[List[Grouping], bool]: The unique groupings in depend_on order, and True if a dependency
+                                         is missing from the resolver.
+        """
+        depend_on_groupings: _typing.Dict[int, Grouping] = {}
+        missing = False
+        for depend_on in getattr(grouping.operation, "depend_on", None) or []:
+            # The depend_on can reference either the operation, the job or a chunked operation
+            depend_on_grouping = self._lookup(depend_on)
+            candidates = [depend_on_grouping] if depend_on_grouping else self._chunk_index.get(id(depend_on), [])
+            missing = missing or not (candidates or id(depend_on) in self._skipped)
+            depend_on_groupings.update((candidate.operation_id, candidate) for candidate in candidates)
+
+        frames: _typing.Optional[_typing.FrozenSet[int]] = None
+        for depend_on in getattr(grouping.operation, "frame_depend_on", None) or []:
+            depend_on_grouping = self._lookup(depend_on)
+            candidates = [depend_on_grouping] if depend_on_grouping else self._chunk_index.get(id(depend_on), [])
+            missing = missing or not (candidates or id(depend_on) in self._skipped)
+            for candidate in candidates:
+                # Without a parsable frame range on either side the whole operation is the dependency
+                if frames is None:
+                    frames = _frame_set(getattr(grouping.operation, "frange", "") or "")
+                candidate_frames = _frame_set(getattr(candidate.operation, "frange", "") or "")
+                if not frames or not candidate_frames or not frames.isdisjoint(candidate_frames):
+                    depend_on_groupings[candidate.operation_id] = candidate
+
+        return list(depend_on_groupings.values()), missing
+
     def find(self, operation: "_AbstractRif", job: _typing.Optional["_Job"] = None) -> _typing.Optional["Grouping"]:
         """Find the grouping from either the operation or the job.
 
@@ -106,11 +289,11 @@ class Resolver:
         Returns:
             Grouping: The grouping object.
         """
-        for grouping in self.groupings:
-            if grouping.operation == operation or grouping.job == job:
-                return grouping
+        grouping = self._operation_index.get(id(operation))
+        if grouping is None and job is not None:
+            grouping = self._job_index.get(id(job))
 
-        return None
+        return grouping
 
     def inject(self, operation: "_AbstractRif", job: "_Job") -> bool:
         """Add a job to the resolver.
@@ -122,7 +305,49 @@ class Resolver:
         Returns:
             bool: True if the job was added to the resolver.
         """
-        self.groupings.append(Grouping(operation=operation, job=job))
+        self._add(Grouping(operation=operation, job=job))
+        return True
+
+    def _add(self, grouping: "Grouping") -> None:
+        """Append an existing grouping, keeping its operation id.
+
+        Args:
+            grouping (Grouping): The grouping object.
+        """
+        self.groupings.append(grouping)
+        self._index(grouping)
+
+    def merge(self, grouping: "Grouping", merged: _typing.Iterable["Grouping"]) -> bool:
+        """Add a grouping standing in for the merged groupings, finding their operations or jobs finds it.
+
+        Args:
+            grouping (Grouping): The grouping running the merged groupings.
+            merged (Iterable[Grouping]): The merged groupings, left out of the resolver.
+
+        Returns:
+            bool: True if the grouping was added to the resolver.
+        """
+        self._add(grouping)
+        for merged_grouping in merged:
+            self._operation_index[id(merged_grouping.operation)] = grouping
+            self._job_index[id(merged_grouping.job)] = grouping
+        return True
+
+    def skip(self, operation: "_AbstractRif") -> bool:
+        """Leave out an operation that doesn't need to run, the operations depending on it resolve as if
+        it already finished.
+
+        Args:
+            operation (AbstractRif): The operation object.
+
+        Returns:
+            bool: True if the operation was skipped.
+        """
+        self._skipped.add(id(operation))
+        # Once every chunk is skipped the chunked operation is satisfied too
+        chunk_source = getattr(operation, "chunk_source", None)
+        if chunk_source is not None:
+            self._skipped.add(id(chunk_source))
         return True
 
     def only_jobs(self) -> list:
@@ -141,35 +366,259 @@ class Resolver:
         """
         return [grouping.operation for grouping in self.groupings]
 
+    def waves(self) -> _typing.List[_typing.List["Grouping"]]:
+        """Group the resolved groupings into dependency waves, every grouping only depends on groupings
+        from earlier waves so a whole wave can be submitted at once.
+
+        Notes:
+            Call on the resolver returned by resolve, the groupings are expected in dependency order.
+
+        Returns:
+            List[List[Grouping]]: The groupings of each wave, in resolved order.
+        """
+        waves: _typing.List[_typing.List[Grouping]] = []
+        wave_by_operation_id: _typing.Dict[int, int] = {}
+        for grouping in self.groupings:
+            wave = 0
+            for depend_on in getattr(grouping.job, "depend_on", None) or []:
+                depend_on_grouping = self._lookup(depend_on)
+                if depend_on_grouping is not None and depend_on_grouping.operation_id in wave_by_operation_id:
+                    wave = max(wave, wave_by_operation_id[depend_on_grouping.operation_id] + 1)
+            wave_by_operation_id[grouping.operation_id] = wave
+            if wave == len(waves):
+                waves.append([])
+            waves[wave].append(grouping)
+
+        return waves
+
     def resolve(self, ignore: bool = False) -> "Resolver":
         """Resolve the dependencies of the RIFs objects to the corresponding jobs.
 
+        The groupings are ordered with Kahn's algorithm, every grouping is placed after all of the
+        groupings it depends on. The ready grouping injected first always goes next, so an injection
+        order that is already valid is kept as is. The ready groupings wait in a heap keyed on their
+        injection index, the ordering takes O((V + E) log V) for V groupings and E dependencies.
+
+        Args:
+            ignore (bool, optional): Force inject the groupings that depend on operations missing from
+                                     the resolver. Defaults to False, which skips them.
+
+        Raises:
+            ResolverCycleError: If the depend_on graph contains a cycle.
+
         Returns:
             Resolver: The resolved dependencies of the RIFs objects to the corresponding jobs.
         """
-        attempts = 0  # Safety net for the while loop
+        position = {id(grouping): index for index, grouping in enumerate(self.groupings)}
+
+        dependents: _typing.List[_typing.List[int]] = [[] for _ in self.groupings]
+        parents: _typing.List[_typing.List[int]] = [[] for _ in self.groupings]
+        in_degree = [0] * len(self.groupings)
+        blocked = [False] * len(self.groupings)
+        for index, grouping in enumerate(self.groupings):
+            depend_on_groupings, blocked[index] = self._depend_on_groupings(grouping)
+            for depend_on_grouping in depend_on_groupings:
+                parent_index = position[id(depend_on_grouping)]
+                dependents[parent_index].append(index)
+                parents[index].append(parent_index)
+                in_degree[index] += 1
+
         ordered_resolver = Resolver()
-        cloned_groupings = self.groupings.copy()
-
-        while cloned_groupings and attempts < 10:
-            grouping = cloned_groupings.pop(0)
-            if not grouping.has_depend_on():
-                ordered_resolver.groupings.append(grouping)
-                continue
-            if grouping.operation.depend_on in ordered_resolver:
+        ordered_resolver._skipped = self._skipped  # pylint: disable=protected-access
+        skipped: _typing.List[Grouping] = []
+        # A heap of the ready injection indices, the lowest one goes next
+        queue = [index for index, degree in enumerate(in_degree) if not degree]
+        visited = 0
+        while queue:
+            index = _heapq.heappop(queue)
+            visited += 1
+            grouping = self.groupings[index]
+            if blocked[index]:
+                skipped.append(grouping)
+            else:
+                if grouping.has_depend_on():
+                    self.swap_depend_on(grouping)
+                ordered_resolver._add(grouping)  # pylint: disable=protected-access
+            for child_index in dependents[index]:
+                # Anything downstream of a missing dependency can't be resolved either
+                blocked[child_index] = blocked[child_index] or blocked[index]
+                in_degree[child_index] -= 1
+                if not in_degree[child_index]:
+                    _heapq.heappush(queue, child_index)
+
+        if visited != len(self.groupings):
+            raise ResolverCycleError(self._find_cycle(in_degree, parents))
+
+        if skipped and ignore:
+            # Force inject the groupings, the dependencies we can't find are dropped
+            for grouping in skipped:
                 self.swap_depend_on(grouping)
-                ordered_resolver.groupings.append(grouping)
-                continue
-            cloned_groupings.append(grouping)
-            attempts += 1
-        # If the rif depends are not include in the grouping it will ignore
-        # and not append the grouping. We can ignore that operation and force
-        # inject the groupings
-        if ignore:
-            ordered_resolver.groupings.extend(cloned_groupings)
+                ordered_resolver._add(grouping)  # pylint: disable=protected-access
+        elif skipped:
+            _logger.warning(
+                "Skipping %s groupings with depend_on missing from the resolver: %s",
+                len(skipped),
+                ", ".join(grouping.name() for grouping in skipped),
+            )
 
         return ordered_resolver
 
+    def resolve_stream(
+        self, groupings: _typing.Iterable["Grouping"], expected: _typing.Iterable[_typing.Any], ignore: bool = False
+    ) -> _typing.Iterator["Grouping"]:
+        """Inject the groupings as they are built and yield each one as soon as everything it depends on
+        was yielded, so the first groupings can be submitted while the rest are still building.
+
+        Notes:
+            A grouping is held back until every expected operation it depends on was injected, then until
+            every grouping it depends on was yielded. The groupings are yielded in a valid resolved order,
+            which can differ from the order of resolve. The resolver keeps them in injection order.
+
+        Args:
+            groupings (Iterable[Grouping]): The groupings, injected one at a time as they are consumed.
+            expected (Iterable[Any]): The operation of every grouping that will be injected, a dependency on
+                                      one of them waits for its grouping instead of being missing.
+            ignore (bool, optional): Yield the groupings that depend on operations missing from the resolver,
+                                     the missing dependencies are dropped. Defaults to False, which skips them.
+
+        Raises:
+            ResolverCycleError: If the depend_on graph contains a cycle.
+
+        Yields:
+            Grouping: The resolved grouping objects.
+        """
+        # The number of groupings still to inject per operation, or per chunked operation
+        unbuilt: _typing.Dict[int, int] = {}
+        for item in expected:
+            for key in self._stream_keys(item):
+                unbuilt[key] = unbuilt.get(key, 0) + 1
+
+        waiting_built: _typing.Dict[int, _typing.List[Grouping]] = {}
+        waiting_yielded: _typing.Dict[int, _typing.List[Grouping]] = {}
+        remaining: _typing.Dict[int, int] = {}
+        blocked: _typing.Dict[int, bool] = {}
+        settled: _typing.Set[int] = set()
+        skipped: _typing.List[Grouping] = []
+
+        def depend_on_keys(grouping: Grouping) -> _typing.Set[int]:
+            depend_ons = list(getattr(grouping.operation, "depend_on", None) or [])
+            depend_ons.extend(getattr(grouping.operation, "frame_depend_on", None) or [])
+            return {id(depend_on) for depend_on in depend_ons if unbuilt.get(id(depend_on))}
+
+        def on_built(grouping: Grouping) -> _typing.List[Grouping]:
+            """Wait on the groupings it depends on, return the settled groupings."""
+            depend_on_groupings, missing = self._depend_on_groupings(grouping)
+            blocked[grouping.operation_id] = missing and not ignore
+            pending = [parent for parent in depend_on_groupings if parent.operation_id not in settled]
+            for parent in depend_on_groupings:
+                if parent.operation_id in settled and blocked[parent.operation_id]:
+                    blocked[grouping.operation_id] = True
+            for parent in pending:
+                waiting_yielded.setdefault(parent.operation_id, []).append(grouping)
+            remaining[grouping.operation_id] = len(pending)
+            return [] if pending else [grouping]
+
+        def on_settled(grouping: Grouping) -> _typing.List[Grouping]:
+            """Release the groupings waiting on it, return the newly settled groupings."""
+            released = []
+            for child in waiting_yielded.pop(grouping.operation_id, []):
+                # Anything downstream of a missing dependency can't be resolved either
+                blocked[child.operation_id] = blocked[child.operation_id] or blocked[grouping.operation_id]
+                remaining[child.operation_id] -= 1
+                if not remaining[child.operation_id]:
+                    released.append(child)
+            return released
+
+        def release(built: _typing.List[Grouping]) -> _typing.Iterator[Grouping]:
+            ready = _deque(settled_grouping for grouping in built for settled_grouping in on_built(grouping))
+            while ready:
+                grouping = ready.popleft()
+                settled.add(grouping.operation_id)
+                if blocked[grouping.operation_id]:
+                    skipped.append(grouping)
+                else:
+                    if grouping.has_depend_on():
+                        self.swap_depend_on(grouping)
+                    yield grouping
+                ready.extend(on_settled(grouping))
+
+        for grouping in groupings:
+            self._add(grouping)
+            built = []
+            for key in self._stream_keys(grouping.operation):
+                if key not in unbuilt:
+                    continue
+                unbuilt[key] -= 1
+                if not unbuilt[key]:
+                    for waiting in waiting_built.pop(key, []):
+                        remaining[waiting.operation_id] -= 1
+                        if not remaining[waiting.operation_id]:
+                            built.append(waiting)
+            keys = depend_on_keys(grouping)
+            for key in keys:
+                waiting_built.setdefault(key, []).append(grouping)
+            remaining[grouping.operation_id] = len(keys)
+            if not keys:
+                built.append(grouping)
+            yield from release(built)
+
+        # The expected operations that were never injected are missing
+        never_built = {waiting.operation_id: waiting for waitings in waiting_built.values() for waiting in waitings}
+        yield from release(list(never_built.values()))
+
+        if len(settled) != len(self.groupings):
+            position = {id(grouping): index for index, grouping in enumerate(self.groupings)}
+            in_degree = [int(grouping.operation_id not in settled) for grouping in self.groupings]
+            parents = [
+                [position[id(parent)] for parent in self._depend_on_groupings(grouping)[0]]
+                for grouping in self.groupings
+            ]
+            raise ResolverCycleError(self._find_cycle(in_degree, parents))
+
+        if skipped:
+            _logger.warning(
+                "Skipping %s groupings with depend_on missing from the resolver: %s",
+                len(skipped),
+                ", ".join(grouping.name() for grouping in skipped),
+            )
+
+    @staticmethod
+    def _stream_keys(operation: _typing.Any) -> _typing.Tuple[int, ...]:
+        """Return the identities a dependency on the operation can reference, itself and its chunked operation.
+
+        Args:
+            operation (Any): The operation or job object.
+
+        Returns:
+            Tuple[int, ...]: The identities.
+        """
+        chunk_source = getattr(operation, "chunk_source", None)
+        return (id(operation),) if chunk_source is None else (id(operation), id(chunk_source))
+
+    def _find_cycle(
+        self, in_degree: _typing.List[int], parents: _typing.List[_typing.List[int]]
+    ) -> _typing.List[Grouping]:
+        """Walk the unvisited groupings left over from the topological sort until one repeats.
+
+        Args:
+            in_degree (List[int]): The remaining in degree of each grouping.
+            parents (List[List[int]]): The indices of the groupings each grouping depends on.
+
+        Returns:
+            List[Grouping]: The groupings forming the cycle, in depend_on order.
+        """
+        index = next(index for index, degree in enumerate(in_degree) if degree)
+        path: _typing.List[int] = []
+        position: _typing.Dict[int, int] = {}
+        while index not in position:
+            position[index] = len(path)
+            path.append(index)
+            # Every unvisited grouping has at least one unvisited parent
+            index = next(parent for parent in parents[index] if in_degree[parent])
+        cycle = path[position[index] :] + [index]
+        # The walk follows the depend_on backwards, flip it to read as execution order
+        return [self.groupings[cycle_index] for cycle_index in reversed(cycle)]
+
     def swap_depend_on(self, grouping: "Grouping") -> bool:
         """Swap the depend_on from the operation to the job.
 
@@ -179,13 +628,8 @@ class Resolver:
         Returns:
             bool: True if the depend_on was swapped.
         """
-        # Check if the grouping is in the resolver
-        new_depend_on = []
-        for depend_on in grouping.operation.depend_on:
-            # Find the grouping that has the depend_on
-            depend_on_grouping = self.find(operation=depend_on)
-            if depend_on_grouping:
-                new_depend_on.append(depend_on_grouping.job)
-        grouping.job.depend_on = new_depend_on
+        # The dependencies missing from the resolver are dropped
+        depend_on_groupings, _ = self._depend_on_groupings(grouping)
+        grouping.job.depend_on = [depend_on_grouping.job for depend_on_grouping in depend_on_groupings]
 
         return True
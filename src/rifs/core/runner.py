@@ -0,0 +1,92 @@
+"""The shared runner for the manifest build mode, every farm task of a submission calls this file
+with the manifest path and its op id instead of running its own generated script. A comma separated
+list of op ids runs a fused chain back to back in this interpreter, a failed step stops the chain.
+
+Notes:
+    The runner is executed as a plain script on the farm, keep it to the standard library so it
+    doesn't depend on rifs being importable before the operation module is.
+
+Examples:
+    $ python runner.py /vfx/wgid/tmp/farm/rifs/$USER/20240101-1200/1a2b3c4d/rif_manifest_5e6f7a8b.json 3
+    $ python runner.py <manifest> 3 /vfx/wgid/tmp/farm/rifs/$USER/20240101-1200/1a2b3c4d/9f8e7d6c/rif_stats.json
+    $ python runner.py <manifest> 4,5,6
+"""
+
+import functools as _functools
+import importlib as _importlib
+import json as _json
+import sys as _sys
+import typing as _typing
+
+__all__ = ["load_operation", "run"]
+
+
+@_functools.lru_cache(maxsize=None)
+def _read_manifest(manifest_path: str) -> _typing.Dict[str, _typing.Any]:
+    """Read the manifest once, the steps of a chain share it.
+
+    Args:
+        manifest_path (str): The path to the submission manifest.
+
+    Returns:
+        Dict[str, Any]: The manifest.
+    """
+    with open(manifest_path, "r", encoding="utf-8") as open_manifest_file:
+        return _json.load(open_manifest_file)
+
+
+def load_operation(manifest_path: str, operation_id: str) -> _typing.Any:
+    """Rebuild the operation from the manifest entry.
+
+    Args:
+        manifest_path (str): The path to the submission manifest.
+        operation_id (str): The op id of the operation in the manifest.
+
+    Raises:
+        KeyError: If the op id is not in the manifest.
+
+    Returns:
+        AbstractRif: The operation object.
+    """
+    entry = _read_manifest(manifest_path)["operations"][str(operation_id)]
+    operation_class = getattr(_importlib.import_module(entry["module"]), entry["class_name"])
+
+    return operation_class(**entry["kwargs"])
+
+
+def run(manifest_path: str, operation_id: str, stats_path: str = "") -> _typing.Any:
+    """Rebuild the operation from the manifest and call it, or each operation of a chain in order.
+
+    Args:
+        manifest_path (str): The path to the submission manifest.
+        operation_id (str): The op id of the operation in the manifest, comma separated for a chain.
+        stats_path (str, optional): Record the timings of the operation into this sidecar. Defaults to "".
+
+    Returns:
+        Any: The result of the operation call, the last one of a chain.
+    """
+    operation_ids = str(operation_id).split(",")
+    if not stats_path:
+        result = None
+        for chain_operation_id in operation_ids:
+            # An exception stops the chain, the later steps rely on what the failed one writes
+            result = load_operation(manifest_path, chain_operation_id)()
+        return result
+
+    # Only instrumented tasks pay for the rifs import, the operation module imports it anyway
+    from rifs.core.instrument import Recorder  # pylint: disable=import-outside-toplevel
+
+    with Recorder(stats_path, operation_id=str(operation_id)) as recorder:
+        with recorder.phase("import"):
+            operations = [load_operation(manifest_path, chain_operation_id) for chain_operation_id in operation_ids]
+        with recorder.phase("call"):
+            result = None
+            for operation in operations:
+                result = operation()
+            return result
+
+
+if __name__ == "__main__":
+    if len(_sys.argv) not in (3, 4):
+        _sys.exit(f"Usage: {_sys.argv[0]} <manifest> <op id> [<stats sidecar>]")
+    run(*_sys.argv[1:])
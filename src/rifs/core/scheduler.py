@@ -0,0 +1,197 @@
+"""The local scheduler runs a resolved submission as a mini farm on the workstation, honoring the cpus,
+ram and depend_on of the jobs.
+"""
+
+import dataclasses as _dataclasses
+import logging as _logging
+import os as _os
+import time as _time
+import typing as _typing
+
+# Package imports
+from rifs.core import frames as _frames
+from rifs.core.history import RuntimeHistory as _RuntimeHistory
+from rifs.core.memo import MemoStore as _MemoStore
+from rifs.core.resolver import Grouping as _Grouping, Resolver as _Resolver
+from rifs.core.soumission import JobHandle as _JobHandle
+
+__all__ = ["JobReport", "LocalScheduler"]
+
+
+_logger = _logging.getLogger("dd." + __name__)
+_logger.addHandler(_logging.NullHandler())
+
+
+def _workstation_ram() -> int:
+    """Return the physical memory of the workstation.
+
+    Returns:
+        int: The memory in MB, the same unit as the job ram.
+    """
+    try:
+        return _os.sysconf("SC_PAGE_SIZE") * _os.sysconf("SC_PHYS_PAGES") // (1024 * 1024)
+    except (AttributeError, OSError, ValueError):
+        return 16000
+
+
+@_dataclasses.dataclass
+class JobReport:
+    """The timings of a job ran by the local scheduler.
+
+    Attributes:
+        name (str): The name of the grouping.
+        returncode (int): The exit status of the job, None if it was skipped.
+        queue_time (float): The seconds the job waited for resources once its dependencies finished.
+        run_time (float): The seconds the job ran for.
+        skipped (bool): True if the job didn't run because a job it depends on failed.
+    """
+
+    name: str
+    returncode: _typing.Optional[int] = None
+    queue_time: float = 0.0
+    run_time: float = 0.0
+    skipped: bool = False
+
+
+@_dataclasses.dataclass
+class LocalScheduler:
+    """Run the jobs of a resolved resolver on the workstation within a cpus and ram budget.
+
+    Notes:
+        A job starts as soon as the jobs it depends on finished and its cpus and ram fit in what's left
+        of the budget, smaller jobs further down the queue backfill the gaps. A job bigger than the whole
+        budget runs alone. The cpus of jobs that don't honor cores aren't reserved.
+
+    Attributes:
+        cpus (int): The cpus budget. Defaults to the workstation cpu count.
+        ram (int): The ram budget in MB. Defaults to the workstation memory.
+        poll_interval (float): The seconds between checks of the running jobs.
+        memo (MemoStore): Record the outputs of the operations that succeeded, so the next build skips them.
+        history (RuntimeHistory): Record the runtime and peak ram of the operations with a history key that
+                                  succeeded, so the next submission sizes their chunks and resources.
+
+    Examples:
+        >>> resolver = rifs.Constructor(operations).build().resolve()
+        >>> reports = LocalScheduler(cpus=16).run(resolver)
+    """
+
+    cpus: int = _dataclasses.field(default_factory=lambda: _os.cpu_count() or 1)
+    ram: int = _dataclasses.field(default_factory=_workstation_ram)
+    poll_interval: float = 0.1
+    memo: _typing.Optional["_MemoStore"] = None
+    history: _typing.Optional["_RuntimeHistory"] = None
+
+    def _requirements(self, grouping: "_Grouping") -> _typing.Tuple[int, int]:
+        """Return the cpus and ram the job reserves, capped to the budget so any job can run alone.
+
+        Args:
+            grouping (Grouping): The grouping object.
+
+        Returns:
+            Tuple[int, int]: The cpus and ram of the job.
+        """
+        cpus = getattr(grouping.job, "cpus", 1) if getattr(grouping.job, "honor_cores", True) else 0
+        ram = getattr(grouping.job, "ram", 0)
+        return min(cpus, self.cpus), min(ram, self.ram)
+
+    def _record_runtime(self, grouping: "_Grouping", handle: "_JobHandle") -> bool:
+        """Record the runtime of a finished job into the history.
+
+        Args:
+            grouping (Grouping): The grouping object.
+            handle (JobHandle): The handle of the finished job.
+
+        Returns:
+            bool: True if the runtime was recorded, only operations with a history key and a frame range
+                  that parses are.
+        """
+        history_key = getattr(grouping.operation, "history_key", None)
+        if self.history is None or history_key is None:
+            return False
+        frange = getattr(grouping.operation, "frange", "")
+        try:
+            frame_count = len(_frames.parse_frange(frange)) if frange else 1
+        except ValueError:
+            _logger.debug("Can't parse the frame range %r, not recording the runtime.", frange)
+            return False
+        return self.history.record(
+            history_key(), handle.wall_time, frame_count, handle.peak_ram, getattr(grouping.job, "cpus", None)
+        )
+
+    def run(self, resolver: "_Resolver") -> _typing.List[JobReport]:
+        """Run every job of the resolver and wait for them to finish.
+
+        Args:
+            resolver (Resolver): The resolved resolver.
+
+        Returns:
+            List[JobReport]: The report of each job, in resolved order.
+        """
+        parents: _typing.Dict[_Grouping, _typing.List[_Grouping]] = {}
+        for grouping in resolver:
+            # The resolved depend_on holds jobs, a job injected on its own is also the operation
+            depend_on_groupings = (
+                resolver.find(operation=depend_on, job=depend_on)
+                for depend_on in getattr(grouping.job, "depend_on", None) or []
+            )
+            parents[grouping] = [parent for parent in depend_on_groupings if parent is not None]
+
+        reports = {grouping: JobReport(name=grouping.name()) for grouping in resolver}
+        ready_since: _typing.Dict[_Grouping, float] = {}
+        pending = list(resolver)
+        running: _typing.Dict[_Grouping, _JobHandle] = {}
+        free_cpus, free_ram = self.cpus, self.ram
+
+        try:
+            while pending or running:
+                # Release the resources of the finished jobs
+                for grouping, handle in list(running.items()):
+                    if handle.poll() is None:
+                        continue
+                    handle.wait()
+                    reports[grouping].returncode = handle.returncode
+                    reports[grouping].run_time = handle.wall_time
+                    succeeded = handle.returncode == 0
+                    if self.memo is not None and succeeded and getattr(grouping.operation, "outputs", None):
+                        self.memo.record(grouping.operation)
+                    if self.history is not None and succeeded:
+                        self._record_runtime(grouping, handle)
+                    cpus, ram = self._requirements(grouping)
+                    free_cpus, free_ram = free_cpus + cpus, free_ram + ram
+                    del running[grouping]
+
+                # Start the ready jobs that fit in the budget
+                for grouping in list(pending):
+                    parent_reports = [reports[parent] for parent in parents[grouping]]
+                    if any(report.skipped or report.returncode not in (None, 0) for report in parent_reports):
+                        _logger.warning("Skipping %s, a job it depends on failed.", grouping.name())
+                        reports[grouping].skipped = True
+                        pending.remove(grouping)
+                        continue
+                    if any(report.returncode is None for report in parent_reports):
+                        continue
+                    ready_since.setdefault(grouping, _time.monotonic())
+                    cpus, ram = self._requirements(grouping)
+                    if cpus > free_cpus or ram > free_ram:
+                        continue
+                    reports[grouping].queue_time = _time.monotonic() - ready_since[grouping]
+                    pending.remove(grouping)
+                    try:
+                        handle = _JobHandle(grouping.job.command, name=grouping.job.job_name)
+                    except (OSError, ValueError) as error:
+                        _logger.error("Couldn't start %s: %s", grouping.name(), error)
+                        reports[grouping].returncode = _JobHandle.LAUNCH_FAILED_RETURNCODE
+                        continue
+                    grouping.job.handle = running[grouping] = handle
+                    free_cpus, free_ram = free_cpus - cpus, free_ram - ram
+                    _logger.info("Started %s with %s cpus and %s MB.", grouping.name(), cpus, ram)
+
+                if running:
+                    _time.sleep(self.poll_interval)
+        finally:
+            # Don't leave jobs running on the workstation when the caller gives up, like on a KeyboardInterrupt
+            for grouping, handle in running.items():
+                if handle.cancel():
+                    _logger.warning("Cancelled %s.", grouping.name())
+
+        return [reports[grouping] for grouping in resolver]
@@ -17,14 +17,257 @@
 #
 """The backend render framework objects that are used to submit jobs."""
 
+import asyncio as _asyncio
+import collections as _collections
 import dataclasses as _dataclasses
+import functools as _functools
 import os as _os
+import shlex as _shlex
+import signal as _signal
+import subprocess as _subprocess
+import sys as _sys
+import threading as _threading
+import time as _time
+import typing as _typing
+import uuid as _uuid
 
 # Package imports
-from rifs.core.abstraction import AbstractRif as _AbstractRif
+from rifs.core.abstraction import AbstractRif as _AbstractRif, ProcessorRif as _ProcessorRif
+from rifs.core.abstraction import session_temporary_directory as _session_temporary_directory
 
 
-__all__ = ["insert_job"]
+__all__ = ["insert_job", "insert_jobs", "JobHandle"]
+
+
+class JobHandle:
+    """The handle of a locally running job, returned right away. The process starts at once, or once the
+    handles it depends on finished.
+
+    The stdout and stderr are drained by background threads so a chatty render can't deadlock on a
+    full pipe. The last lines of each stream are kept in a bounded ring buffer and every line spills
+    to a log file.
+
+    Attributes:
+        command (List[str]): The command of the job.
+        log_paths (Dict[str, str]): The log file of each stream, keyed by stdout and stderr.
+        skipped (bool): True if the job never started, because a job it depends on failed, it was
+                        cancelled while waiting or its process couldn't start.
+    """
+
+    STREAMS = ("stdout", "stderr")
+    # The exit status of a job skipped because a job it depends on failed
+    SKIPPED_RETURNCODE = 1
+    # The exit status of a job whose process couldn't start, like a shell with a missing command
+    LAUNCH_FAILED_RETURNCODE = 127
+
+    def __init__(
+        self,
+        command: _typing.List[str],
+        log_directory: str = "",
+        name: str = "job",
+        buffer_lines: int = 1000,
+        depend_on: _typing.Sequence["JobHandle"] = (),
+    ) -> None:
+        """Start the job process, or the thread starting it once the jobs it depends on finished.
+
+        Args:
+            command (List[str]): The command to run.
+            log_directory (str, optional): The directory of the log files. Defaults to the session logs directory.
+            name (str, optional): The prefix of the log files. Defaults to "job".
+            buffer_lines (int, optional): The number of lines kept in memory per stream. Defaults to 1000.
+            depend_on (Sequence[JobHandle], optional): The handles to wait for, the job is skipped if one of
+                                                       them failed. Defaults to (), start right away.
+        """
+        self.command = list(command)
+        self.skipped = False
+        log_directory = log_directory or _os.path.join(_session_temporary_directory(), "logs")
+        _os.makedirs(log_directory, exist_ok=True)
+        log_prefix = _os.path.join(log_directory, f"{name}_{_uuid.uuid4().hex[:8]}")
+        self.log_paths = {stream: f"{log_prefix}.{stream}.log" for stream in self.STREAMS}
+        self._buffers: _typing.Dict[str, _typing.Deque[str]] = {
+            stream: _collections.deque(maxlen=buffer_lines) for stream in self.STREAMS
+        }
+        self._start: _typing.Optional[float] = None
+        self._end: _typing.Optional[float] = None
+        self._peak_ram: _typing.Optional[int] = None
+        self._returncode: _typing.Optional[int] = None
+        self._finished = _threading.Event()
+        self._lock = _threading.Lock()
+        self._process: _typing.Optional[_subprocess.Popen] = None
+        self._drains: _typing.List[_threading.Thread] = []
+        if depend_on:
+            _threading.Thread(target=self._start_after, args=(list(depend_on),), daemon=True).start()
+        else:
+            self._launch()
+
+    def __repr__(self) -> str:
+        return f"JobHandle(pid={self.pid}, returncode={self.returncode}, command={self.command!r})"
+
+    def _launch(self) -> None:
+        """Start the process and the threads draining and reaping it, unless the job already finished."""
+        with self._lock:
+            if self._finished.is_set():
+                return
+            self._start = _time.monotonic()
+            self._process = _subprocess.Popen(self.command, stdout=_subprocess.PIPE, stderr=_subprocess.PIPE)
+            self._drains = [
+                _threading.Thread(target=self._drain, args=(stream, getattr(self._process, stream)), daemon=True)
+                for stream in self.STREAMS
+            ]
+        for drain in self._drains:
+            drain.start()
+        _threading.Thread(target=self._watch, daemon=True).start()
+
+    def _start_after(self, depend_on: _typing.List["JobHandle"]) -> None:
+        """Wait for the jobs it depends on, then start the process or skip the job if one of them failed.
+        A process that can't start finishes the job with LAUNCH_FAILED_RETURNCODE, so waiting on it never hangs.
+
+        Args:
+            depend_on (List[JobHandle]): The handles to wait for.
+        """
+        for handle in depend_on:
+            handle.wait()
+        failed = [handle for handle in depend_on if handle.returncode != 0]
+        if failed:
+            self._skip(f"Skipped, {len(failed)} of the jobs it depends on failed.")
+            return
+        try:
+            self._launch()
+        except (OSError, ValueError) as error:
+            self._skip(f"Couldn't start the job: {error}", self.LAUNCH_FAILED_RETURNCODE)
+
+    def _skip(self, reason: str, returncode: int = SKIPPED_RETURNCODE) -> bool:
+        """Finish the job without starting its process, the reason goes to the stderr log.
+
+        Args:
+            reason (str): Why the job didn't start.
+            returncode (int, optional): The exit status of the job. Defaults to SKIPPED_RETURNCODE.
+
+        Returns:
+            bool: True if the job was skipped, False if its process already started.
+        """
+        with self._lock:
+            if self._process is not None or self._finished.is_set():
+                return False
+            self.skipped = True
+            self._returncode = returncode
+            self._buffers["stderr"].append(reason)
+            for stream in self.STREAMS:
+                with open(self.log_paths[stream], "w", encoding="utf-8") as open_log_file:
+                    open_log_file.write(f"{reason}\n" if stream == "stderr" else "")
+            self._finished.set()
+        return True
+
+    def _drain(self, stream: str, pipe: _typing.IO[bytes]) -> None:
+        """Copy the stream lines into the ring buffer and the log file until the pipe closes.
+
+        Args:
+            stream (str): The stream name, stdout or stderr.
+            pipe (IO[bytes]): The pipe of the process stream.
+        """
+        with pipe, open(self.log_paths[stream], "w", encoding="utf-8") as open_log_file:
+            for raw_line in iter(pipe.readline, b""):
+                line = raw_line.decode("utf-8", errors="replace")
+                self._buffers[stream].append(line.rstrip("\n"))
+                open_log_file.write(line)
+                open_log_file.flush()
+
+    def _watch(self) -> None:
+        """Reap the process with its resource usage, then record the end time once its streams are drained."""
+        try:
+            _, status, usage = _os.wait4(self._process.pid, 0)
+        except (AttributeError, ChildProcessError):
+            # No wait4 on this platform, or a terminate already reaped the process
+            self._process.wait()
+        else:
+            self._process.returncode = _os.waitstatus_to_exitcode(status)
+            # The max rss is in KB on linux, in bytes on macOS
+            self._peak_ram = usage.ru_maxrss // (1024 * 1024 if _sys.platform == "darwin" else 1024)
+        self._end = _time.monotonic()
+        for drain in self._drains:
+            drain.join()
+        self._finished.set()
+
+    @property
+    def pid(self) -> _typing.Optional[int]:
+        """int: The process id of the job, None until it started or if it was skipped."""
+        return None if self._process is None else self._process.pid
+
+    @property
+    def returncode(self) -> _typing.Optional[int]:
+        """int: The exit status of the job, None while it's waiting or running."""
+        return self._returncode if self._process is None else self._process.returncode
+
+    @property
+    def peak_ram(self) -> _typing.Optional[int]:
+        """int: The peak ram of the job and the processes it waited on in MB, None until it finished or if
+        the platform can't measure it."""
+        return self._peak_ram
+
+    @property
+    def wall_time(self) -> float:
+        """float: The seconds the job ran for, up to now if it's still running, 0.0 until it started."""
+        if self._start is None:
+            return 0.0
+        return (self._end if self._end is not None else _time.monotonic()) - self._start
+
+    def poll(self) -> _typing.Optional[int]:
+        """Check if the job finished.
+
+        Returns:
+            int: The exit status of the job, None while it's running.
+        """
+        # The watcher reaps the process, polling here would steal its resource usage
+        return self.returncode
+
+    def wait(self, timeout: _typing.Optional[float] = None) -> int:
+        """Wait for the job to finish and its logs to be written.
+
+        Args:
+            timeout (float, optional): The seconds to wait for. Defaults to None, no limit.
+
+        Raises:
+            subprocess.TimeoutExpired: If the job is still running after the timeout.
+
+        Returns:
+            int: The exit status of the job.
+        """
+        if not self._finished.wait(timeout):
+            raise _subprocess.TimeoutExpired(self.command, timeout)  # type: ignore[arg-type]
+        return self.returncode  # type: ignore[return-value]
+
+    def cancel(self, grace: float = 5.0) -> bool:
+        """Terminate the job, kill it if it's still running after the grace period.
+
+        Args:
+            grace (float, optional): The seconds to wait after terminating. Defaults to 5.0.
+
+        Returns:
+            bool: True if the job was waiting or running and got cancelled.
+        """
+        # A job still waiting on the jobs it depends on never starts, it ends like a terminated one
+        if self._skip("Cancelled before it started.", -_signal.SIGTERM):
+            return True
+        if self._process is None or self._process.returncode is not None:
+            return False
+        self._process.terminate()
+        if not self._finished.wait(grace):
+            self._process.kill()
+        self._finished.wait()
+        return True
+
+    def tail(self, stream: str = "stdout", lines: _typing.Optional[int] = None) -> _typing.List[str]:
+        """Return the last lines of a stream kept in memory, the full output is in the log file.
+
+        Args:
+            stream (str, optional): The stream name, stdout or stderr. Defaults to "stdout".
+            lines (int, optional): The number of lines. Defaults to None, the whole ring buffer.
+
+        Returns:
+            List[str]: The last lines of the stream.
+        """
+        buffered = list(self._buffers[stream])
+        return buffered[-lines:] if lines else buffered
 
 # Create a mock job object
 @_dataclasses.dataclass
@@ -42,15 +285,121 @@ class _Job:
     frame_range: str = ""
     auto_dump: bool = False
     honor_cores: bool = True
+    depend_on: list = _dataclasses.field(default_factory=list)
+    handle: _typing.Optional[JobHandle] = _dataclasses.field(default=None, init=False, repr=False, compare=False)
+
+    def submit(self) -> JobHandle:
+        """Submit the job, the handle is returned as soon as the process started.
+
+        Notes:
+            The local job stands in for the farm, the handle is returned right away. The process starts
+            once the submitted jobs it depends on finished, and the job is skipped if one of them failed.
+            Independent jobs start right away.
+
+        Returns:
+            JobHandle: The handle of the job.
+        """
+        depend_on_handles = [
+            depend_on.handle
+            for depend_on in getattr(self, "depend_on", None) or []
+            if isinstance(getattr(depend_on, "handle", None), JobHandle)
+        ]
+        self.handle = JobHandle(self.command, name=self.job_name, depend_on=depend_on_handles)
+        return self.handle
+
+    async def submit_async(self, timeout: _typing.Optional[float] = None):
+        """Submit the job without blocking the event loop.
 
-    def submit(self):
-        """Submit the job."""
-        import subprocess
-        process = subprocess.Popen(self.command)
-        process.wait()
+        Args:
+            timeout (float, optional): Kill the job if it runs longer than the seconds. Defaults to None.
+
+        Raises:
+            asyncio.TimeoutError: If the job ran longer than the timeout.
+
+        Returns:
+            asyncio.subprocess.Process: The finished process.
+        """
+        process = await _asyncio.create_subprocess_exec(*self.command)
+        try:
+            await _asyncio.wait_for(process.wait(), timeout)
+        except (_asyncio.CancelledError, _asyncio.TimeoutError):
+            # Don't leave the process running when the caller gives up on it
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            raise
         return process
 
 
+@_functools.lru_cache(maxsize=None)
+def _job_prototype(show: str) -> _Job:
+    """Build the standard job of the show every job is copied from.
+
+    Args:
+        show (str): The show name.
+
+    Returns:
+        Job: The prototype job, never handed out.
+    """
+    # Default ram and cpu
+    return _Job(show=show, activity="comprender", job_class_type="NukeJob", job_name=show, ram=8000, cpus=2)
+
+
+@_functools.lru_cache(maxsize=None)
+def _transfer_plan(operation_class: type) -> _typing.Tuple[str, ...]:
+    """Find the fields transferred from the operations of the class to their job, once per class.
+
+    Args:
+        operation_class (type): The operation class.
+
+    Returns:
+        Tuple[str, ...]: The names of the fields to transfer.
+    """
+    rif_field_names = {rif_field.name for rif_field in _dataclasses.fields(_AbstractRif)}
+    return tuple(
+        operation_field.name
+        for operation_field in _dataclasses.fields(operation_class)
+        if operation_field.name in rif_field_names and not operation_field.metadata.get("exempt")
+    )
+
+
+def _show_prototype() -> _Job:
+    """Return the prototype job of the show, the show is read from the environment on every call since a
+    panel can switch show.
+
+    Returns:
+        Job: The prototype job, never handed out.
+    """
+    return _job_prototype(_os.getenv("DD_SHOW", "DEV01"))
+
+
+def _new_job(
+    command: _typing.List[str], kwargs: _typing.Dict[str, _typing.Any], prototype: _typing.Optional[_Job] = None
+) -> _Job:
+    """Copy the prototype job, then apply the command and the kwargs.
+
+    Args:
+        command (List[str]): The command of the job.
+        kwargs (Dict[str, Any]): The job attributes to set.
+        prototype (Job, optional): The prototype job to copy. Defaults to the prototype of the current show.
+
+    Returns:
+        Job: The job object.
+    """
+    prototype = _show_prototype() if prototype is None else prototype
+    # Skip the dataclass init and the copy module, only the instance dict of the prototype is copied
+    sousmission_job = _Job.__new__(_Job)
+    sousmission_job.__dict__.update(prototype.__dict__)
+    # The mutable fields are never shared with the prototype
+    sousmission_job.env = {}
+    sousmission_job.depend_on = []
+    sousmission_job.command = command
+    for key, value in kwargs.items():
+        setattr(sousmission_job, key, value)
+    sousmission_job.env["outputImage"] = kwargs.get("outputImage", "")
+    return sousmission_job
+
+
 def standard_job(**kwargs) -> _Job:
     """Create a standard submission job object with the default values the suffice for Nuke.
 
@@ -62,28 +411,30 @@ def standard_job(**kwargs) -> _Job:
         frame_range (str): The frame range. Defaults to "".
         honor_cores (bool): The honor cores. Defaults to True.
         job_class_type (str): The job class type. Defaults to "NukeJob".
-        job_name (str): The job name. Defaults to "DEV01".
+        job_name (str): The job name. Defaults to the DD_SHOW environment variable.
         ram (int): The ram. Defaults to 8000.
-        show (str): The show name. Defaults to "DEV01".
+        show (str): The show name. Defaults to the DD_SHOW environment variable.
 
     Returns:
         Job: The job object.
     """
-    show = _os.getenv("DD_SHOW", "DEV01")
-    sousmission_job = _Job()
-    sousmission_job.show = show
-    sousmission_job.activity = "comprender"
-    sousmission_job.job_class_type = "NukeJob"
-    sousmission_job.job_name = show
-    sousmission_job.env["outputImage"] = kwargs.get("outputImage", "")
-    # Default ram and cpu
-    sousmission_job.ram = 8000
-    sousmission_job.cpus = 2
+    return _new_job([], kwargs)
 
-    for key, value in kwargs.items():
-        setattr(sousmission_job, key, value)
 
-    return sousmission_job
+def _job_command(operation: "_AbstractRif", script: str) -> _typing.List[str]:
+    """Return the command of the operation job, a processor runs its own command instead of a script.
+
+    Args:
+        operation (AbstractRif): The operation.
+        script (str): The script to run.
+
+    Returns:
+        List[str]: The command.
+    """
+    if isinstance(operation, _ProcessorRif) and operation.command:
+        command = operation.command
+        return _shlex.split(command) if isinstance(command, str) else list(command)
+    return operation.command_override + [script]
 
 
 def insert_job(operation: "_AbstractRif", script: str, **kwargs) -> "_job.Job":
@@ -91,7 +442,7 @@ def insert_job(operation: "_AbstractRif", script: str, **kwargs) -> "_job.Job":
 
     Args:
         operation (AbstractRif): The operation to wrap.
-        script (str): The script to run.
+        script (str): The script to run, ignored by a processor with a command.
 
     Keyword Args:
         outputImage (str): The output image.
@@ -99,17 +450,55 @@ def insert_job(operation: "_AbstractRif", script: str, **kwargs) -> "_job.Job":
     Returns:
         Job: The job object.
     """
-    rif_duck_job = standard_job(**kwargs)
-    rif_duck_job.command = operation.command_override + [script]  # pylint: disable=protected-access
-    print(rif_duck_job.command)
-    rif_duck_job.env["outputImage"] = kwargs.get("outputImage", "")
+    return _wrap_operation(operation, script, kwargs, _show_prototype(), _transfer_plan(type(operation)))
 
-    for key, value in kwargs.items():
-        setattr(rif_duck_job, key, value)
 
+def _wrap_operation(
+    operation: "_AbstractRif",
+    script: str,
+    kwargs: _typing.Dict[str, _typing.Any],
+    prototype: _Job,
+    transfer_plan: _typing.Tuple[str, ...],
+) -> _Job:
+    """Wrap a rifs operation into a copy of the prototype job.
+
+    Args:
+        operation (AbstractRif): The operation to wrap.
+        script (str): The script to run, ignored by a processor with a command.
+        kwargs (Dict[str, Any]): The job attributes to set.
+        prototype (Job): The prototype job to copy.
+        transfer_plan (Tuple[str, ...]): The fields of the operation class transferred to the job.
+
+    Returns:
+        Job: The job object.
+    """
+    rif_duck_job = _new_job(_job_command(operation, script), kwargs, prototype)
     # Set the values from the operation
-    for rif_field in _dataclasses.fields(_AbstractRif):
-        if hasattr(operation, rif_field.name) and not rif_field.metadata.get("exempt"):
-            setattr(rif_duck_job, rif_field.name, getattr(operation, rif_field.name))
+    for field_name in transfer_plan:
+        setattr(rif_duck_job, field_name, getattr(operation, field_name))
 
     return rif_duck_job
+
+
+def insert_jobs(operations: _typing.Sequence["_AbstractRif"], scripts: _typing.Sequence[str]) -> _typing.List[_Job]:
+    """Wrap many rifs operations into job objects, each with its own soumission kwargs. The prototype job
+    and the transfer plan of each operation class are only looked up once for all of them.
+
+    Args:
+        operations (Sequence[AbstractRif]): The operations to wrap.
+        scripts (Sequence[str]): The script to run of each operation.
+
+    Raises:
+        ValueError: If there isn't one script per operation.
+
+    Returns:
+        List[Job]: The job of each operation, in order.
+    """
+    if len(operations) != len(scripts):
+        raise ValueError(f"Expected one script per operation. Got {len(scripts)} for {len(operations)}.")
+    prototype = _show_prototype()
+    transfer_plans = {operation_class: _transfer_plan(operation_class) for operation_class in map(type, operations)}
+    return [
+        _wrap_operation(operation, script, operation.soumission_kwargs, prototype, transfer_plans[type(operation)])
+        for operation, script in zip(operations, scripts)
+    ]
@@ -0,0 +1,45 @@
+"""The store module reads and writes the local json stores, like the memo and the runtime history, so a
+reader never sees a partially written store.
+"""
+
+import json as _json
+import os as _os
+import typing as _typing
+import uuid as _uuid
+
+__all__ = ["load_json", "save_json"]
+
+
+def load_json(path: str) -> _typing.Dict[str, _typing.Any]:
+    """Read a json store, a missing or corrupted store reads as empty.
+
+    Args:
+        path (str): The json file of the store.
+
+    Returns:
+        Dict[str, Any]: The content of the store.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as open_store_file:
+            content = _json.load(open_store_file)
+    except (OSError, ValueError):
+        return {}
+    return content if isinstance(content, dict) else {}
+
+
+def save_json(path: str, content: _typing.Mapping[str, _typing.Any]) -> str:
+    """Write a json store through a rename, concurrent writers can't leave a partial file.
+
+    Args:
+        path (str): The json file of the store.
+        content (Mapping[str, Any]): The content of the store.
+
+    Returns:
+        str: The json file of the store.
+    """
+    _os.makedirs(_os.path.dirname(path), exist_ok=True)
+    partial_path = f"{path}.{_uuid.uuid4().hex[:8]}.partial"
+    with open(partial_path, "w", encoding="utf-8") as open_store_file:
+        _json.dump(content, open_store_file, separators=(",", ":"))
+    _os.replace(partial_path, path)
+    return path
@@ -18,8 +18,13 @@
 """The transimission module supports utilities code for converying data between the RIFs objects
 and the submission jobs.
 """
+import functools as _functools
+import hashlib as _hashlib
+import json as _json
 import logging
 import os as _os
+import typing as _typing
+import uuid as _uuid
 from dataclasses import fields as _fields
 
 # import dd.runtime.api
@@ -30,49 +35,155 @@ from dataclasses import fields as _fields
 
 # Package imports
 import rifs.core
-from rifs.core import constants as _constants
+from rifs.core import abstraction as _abstraction, constants as _constants
 
 
 _logger = logging.getLogger("dd." + __name__)
 _logger.addHandler(logging.NullHandler())
 
 
-def generate_script(operation: "rifs.core.AbstractRif") -> str:
-    """Generate a script from the operation object. If the operation object is a processor
-    we skip the generation of the script. Its not necessary since we are using the straight 
-    command.
+def operation_entry(operation: "rifs.core.AbstractRif") -> _typing.Dict[str, _typing.Any]:
+    """Collect what a runner needs to rebuild the operation, the module, class name and init kwargs.
 
     Args:
         operation (rifs.core.AbstractRif): The operation object.
 
     Returns:
-        str: The path to the generated
+        Dict[str, Any]: The module, class_name and kwargs of the operation.
     """
-    if isinstance(operation, rifs.core.ProcessorRif):
-        return ""
-    # Get the module name
-    operation_module_name = operation.namespace or operation.__module__
-    # Get the class name
-    operation_class_name = type(operation).__name__
-    # Get the kwargs
     operation_kwargs = {}
     for field in _fields(operation):
-
-
-        print(field.metadata, field.init, field.name)
         # Moving to python 3.9 we can use the kw_only attribute
         ignore_field_condition = [field.metadata.get(key, False) for key in ["kw_only", "exempt"]]
         if field.init and not any(ignore_field_condition):
             operation_kwargs[field.name] = getattr(operation, field.name)
+
+    return {
+        "module": operation.namespace or operation.__module__,
+        "class_name": type(operation).__name__,
+        "kwargs": operation_kwargs,
+    }
+
+
+@_functools.lru_cache(maxsize=4096)
+def _render_script(module: str, class_name: str, kwargs: str, template: str) -> _typing.Tuple[str, str]:
+    """Render the script and find its path in the content addressed store.
+
+    Notes:
+        The cache is the index of the store, an operation fingerprint seen before skips the rendering
+        and the hashing.
+
+    Args:
+        module (str): The module of the operation.
+        class_name (str): The class name of the operation.
+        kwargs (str): The repr of the operation kwargs.
+        template (str): The script template.
+
+    Returns:
+        Tuple[str, str]: The script and the path to the stored script.
+    """
+    operation_duck_script = template.format(module=module, class_name=class_name, kwargs=kwargs)
+    digest = _hashlib.sha256(operation_duck_script.encode("utf-8")).hexdigest()
+    store_directory = _os.path.join(_os.path.expandvars(_constants.RIF_SCRIPT_STORE_ROOT), digest[:2])
+    return operation_duck_script, _os.path.join(store_directory, f"rif_{class_name.lower()}_{digest}.py")
+
+
+def _store_script(module: str, class_name: str, kwargs: str, template: str = _constants.RIF_SCRIPT_TEMPLATE) -> str:
+    """Write the rendered script into the content addressed store, unless the same content is already stored.
+
+    Notes:
+        The store lives on the shared temporary mount which gets cleaned, the stored script is touched on
+        every call and written again once purged.
+
+    Args:
+        module (str): The module of the operation.
+        class_name (str): The class name of the operation.
+        kwargs (str): The repr of the operation kwargs.
+        template (str, optional): The script template. Defaults to RIF_SCRIPT_TEMPLATE.
+
+    Returns:
+        str: The path to the stored script.
+    """
+    operation_duck_script, store_script_path = _render_script(module, class_name, kwargs, template)
+    try:
+        # Touch the reused script so the cleaners going by age keep it while it's still submitted
+        _os.utime(store_script_path)
+        return store_script_path
+    except FileNotFoundError:
+        pass
+
+    _os.makedirs(_os.path.dirname(store_script_path), exist_ok=True)
+    # Write next to the final path and rename, concurrent writers of the same content can't leave a partial file
+    partial_script_path = f"{store_script_path}.{_uuid.uuid4().hex[:8]}.partial"
+    with open(partial_script_path, "w", encoding="utf-8") as open_script_file:
+        open_script_file.write(operation_duck_script)
+    _os.replace(partial_script_path, store_script_path)
+
+    return store_script_path
+
+
+def generate_script(operation: "rifs.core.AbstractRif", store: bool = True, instrument: bool = False) -> str:
+    """Generate a script from the operation object. If the operation object is a processor
+    we skip the generation of the script. Its not necessary since we are using the straight 
+    command.
+
+    Args:
+        operation (rifs.core.AbstractRif): The operation object.
+        store (bool, optional): Write the script once into the content addressed store, identical
+                                operations share the same script. Otherwise the script is written
+                                into the operation temporary directory. Defaults to True.
+        instrument (bool, optional): Record the timings of the operation into the sidecar passed as the
+                                     first argument of the script. Defaults to False.
+
+    Returns:
+        str: The path to the generated
+    """
+    if isinstance(operation, rifs.core.ProcessorRif):
+        return ""
+    entry = operation_entry(operation)
+    template = _constants.RIF_INSTRUMENTED_SCRIPT_TEMPLATE if instrument else _constants.RIF_SCRIPT_TEMPLATE
+    if store:
+        return _store_script(entry["module"], entry["class_name"], repr(entry["kwargs"]), template)
     # Build the script from the template and save it in the temp directory
-    operation_duck_script = _constants.RIF_SCRIPT_TEMPLATE.format(
-        module=operation_module_name, class_name=operation_class_name, kwargs=operation_kwargs
-    )
+    operation_duck_script = template.format(**entry)
     # Format the script with black - Make it pretty
     # operation_duck_script = _black.format_str(operation_duck_script, mode=_black.FileMode())
     # Write the script to the temporary directory
-    temp_script_path = _os.path.join(operation.temporary_directory, f"rif_{operation_class_name.lower()}.py")
+    temp_script_path = _os.path.join(
+        operation.make_temporary_directory(), f"rif_{entry['class_name'].lower()}.py"
+    )
     with open(temp_script_path, "w", encoding="utf-8") as open_script_file:
         open_script_file.write(operation_duck_script)
 
     return temp_script_path
+
+
+def generate_manifest(operations: _typing.Dict[str, "rifs.core.AbstractRif"]) -> str:
+    """Write a single manifest for the whole submission, the shared runner rebuilds an operation
+    from its op id instead of each operation writing its own script.
+
+    Args:
+        operations (Dict[str, rifs.core.AbstractRif]): The operations keyed by op id, the processors are skipped.
+
+    Raises:
+        TypeError: If the operation kwargs can't be serialized to json.
+
+    Returns:
+        str: The path to the manifest.
+    """
+    manifest = {
+        "version": _constants.RIF_MANIFEST_VERSION,
+        "operations": {
+            operation_id: operation_entry(operation)
+            for operation_id, operation in operations.items()
+            if not isinstance(operation, rifs.core.ProcessorRif)
+        },
+    }
+    manifest_directory = _abstraction.session_temporary_directory()
+    # The session directory is only created once per session, the shared mount might have been cleaned since
+    _os.makedirs(manifest_directory, exist_ok=True)
+    manifest_path = _os.path.join(manifest_directory, f"rif_manifest_{_uuid.uuid4().hex[:8]}.json")
+    with open(manifest_path, "w", encoding="utf-8") as open_manifest_file:
+        _json.dump(manifest, open_manifest_file, separators=(",", ":"))
+
+    return manifest_path
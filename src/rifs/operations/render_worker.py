@@ -0,0 +1,148 @@
+"""The warm render worker of the Nuke render server, it loads the script once then renders the frame
+chunks it reads from stdin until it's told to quit.
+
+Each request and response is a json line. Nuke prints to stdout too, so the responses are prefixed
+with RESPONSE_PREFIX and the server ignores every other line.
+
+Notes:
+    The worker runs inside the Nuke interpreter, keep it to the standard library. The command line flags
+    of the operations, like --gpu or -p, are given to the Nuke interpreter starting the worker. The --fake flag
+    replaces Nuke with a stand in that sleeps RIFS_FAKE_FRAME_SECONDS per frame and fails the frames
+    listed in RIFS_FAKE_FAIL_FRAMES, so the server can be exercised without a license.
+
+Examples:
+    $ nuke -t render_worker.py /path/to/comp.nk
+    $ python render_worker.py --fake /path/to/comp.nk
+"""
+
+import json as _json
+import os as _os
+import sys as _sys
+import time as _time
+import typing as _typing
+
+__all__ = ["RESPONSE_PREFIX", "serve"]
+
+
+RESPONSE_PREFIX = "RIFS-RENDER-WORKER "
+
+
+class _FakeKnob:
+    """A stand in for a nuke knob."""
+
+    def __init__(self, value: _typing.Any) -> None:
+        self._value = value
+
+    def value(self) -> _typing.Any:
+        return self._value
+
+
+class _FakeNode:
+    """A stand in for a nuke node, only its name and disable knob."""
+
+    def __init__(self, name: str, disabled: bool = False) -> None:
+        self._name = name
+        self._disabled = disabled
+
+    def __getitem__(self, knob: str) -> _FakeKnob:
+        return _FakeKnob(self._disabled if knob == "disable" else None)
+
+    def name(self) -> str:
+        return self._name
+
+
+class _FakeNuke:
+    """A stand in for the nuke module, it renders by sleeping. Its script has an enabled and a disabled
+    top level write node and an enabled write node inside a group.
+    """
+
+    def __init__(self) -> None:
+        self.frame_seconds = float(_os.getenv("RIFS_FAKE_FRAME_SECONDS", "0"))
+        self.fail_frames = {int(frame) for frame in _os.getenv("RIFS_FAKE_FAIL_FRAMES", "").split()}
+
+    def scriptOpen(self, script: str) -> None:  # pylint: disable=invalid-name
+        if not _os.path.exists(script):
+            raise RuntimeError(f"{script}: No such file or directory")
+
+    def toNode(self, name: str) -> _FakeNode:  # pylint: disable=invalid-name
+        return _FakeNode(name)
+
+    def allNodes(  # pylint: disable=invalid-name
+        self, node_class: str, recurseGroups: bool = False  # pylint: disable=invalid-name
+    ) -> _typing.List[_FakeNode]:
+        nodes = [_FakeNode(f"{node_class}1"), _FakeNode(f"{node_class}2", disabled=True)]
+        return nodes + [_FakeNode(f"Group1.{node_class}1")] if recurseGroups else nodes
+
+    def executeMultiple(  # pylint: disable=invalid-name
+        self, nodes: _typing.List[_FakeNode], ranges: _typing.List[_typing.Tuple[int, int, int]]
+    ) -> None:
+        for first, last, step in ranges:
+            for frame in range(first, last + 1, step):
+                _time.sleep(self.frame_seconds)
+                if frame in self.fail_frames:
+                    node_names = ", ".join(node.name() for node in nodes)
+                    raise RuntimeError(f"Fake render of {node_names} failed on frame {frame}")
+
+
+def _respond(response: _typing.Dict[str, _typing.Any]) -> None:
+    """Write a response line for the server.
+
+    Args:
+        response (Dict[str, Any]): The response.
+    """
+    _sys.stdout.write(RESPONSE_PREFIX + _json.dumps(response) + "\n")
+    _sys.stdout.flush()
+
+
+def _write_nodes(nuke: _typing.Any) -> _typing.List[_typing.Any]:
+    """Find the write nodes rendered without any given node, like nuke -x the enabled ones inside the groups too.
+
+    Args:
+        nuke (module): The nuke module, or its fake stand in.
+
+    Returns:
+        List[Node]: The enabled write nodes.
+    """
+    return [node for node in nuke.allNodes("Write", recurseGroups=True) if not node["disable"].value()]
+
+
+def serve(script: str, nuke: _typing.Any) -> int:
+    """Load the script and render the requests read from stdin.
+
+    Args:
+        script (str): The path to the nuke script.
+        nuke (module): The nuke module, or its fake stand in.
+
+    Returns:
+        int: The exit status of the worker.
+    """
+    try:
+        nuke.scriptOpen(script)
+    except Exception as error:  # pylint: disable=broad-except
+        _respond({"status": "error", "error": str(error)})
+        return 1
+    _respond({"status": "ready"})
+
+    for line in _sys.stdin:
+        request = _json.loads(line)
+        if request.get("quit"):
+            break
+        start = _time.monotonic()
+        try:
+            nodes = [nuke.toNode(name) for name in request.get("nodes", [])] or _write_nodes(nuke)
+            nuke.executeMultiple(nodes, [tuple(frame_run) for frame_run in request["ranges"]])
+        except Exception as error:  # pylint: disable=broad-except
+            _respond({"id": request["id"], "status": "error", "error": str(error)})
+            continue
+        _respond({"id": request["id"], "status": "ok", "seconds": _time.monotonic() - start})
+
+    return 0
+
+
+if __name__ == "__main__":
+    _arguments = _sys.argv[1:]
+    if _arguments[:1] == ["--fake"]:
+        _sys.exit(serve(_arguments[1], _FakeNuke()))
+    import nuke as _nuke  # pylint: disable=import-error
+
+    _sys.exit(serve(_arguments[0], _nuke))
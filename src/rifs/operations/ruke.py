@@ -3,27 +3,47 @@
 import os as _os
 import logging as _logging
 import dataclasses as _dataclasses
+import functools as _functools
+import time as _time
 
-from typing import List as _List
+from typing import Any as _Any, Callable as _Callable, Dict as _Dict, List as _List, Mapping as _Mapping
+from typing import Optional as _Optional, Tuple as _Tuple
 
 # Package imports
 import rifs as _rifs
+from rifs.core import frames as _frames
+from rifs.core import history as _history
 
 
 _logger = _logging.getLogger("dd." + __name__)
 _logger.addHandler(_logging.NullHandler())
 
+# The per frame statuses of a rendered frame, any other status is retried
+_DONE_STATUSES = frozenset(("done", "ok", "succeeded"))
 
-FLAG_MAPPING = {
-    "gpu": "--gpu",  #
-    "render_order": "--sro",  # Force the application to obey the render order of Write nodes such that Reads can use files created by earlier Write nodes
-    "interactive": "-i",  # with -x or -t use interactive, not render, license
-    "proxy_mode": "-p",  # turn on proxy mode (use -f to force full size)
-    "full_size": "-f",  # render at full size (turns off proxy; use -p to force render at proxy)
-    "not_writes": "--rendertonull",  # Direct all writes to null when executing a script
-    "classic_rendering": "--classic_rendering",  # Classic rendering architecture which renders the node graph scanline-by-scanline, on demand.
-    "topdown": "--topdown",  # Top-down mode renders the node graph from the top to the bottom, node-by-node. It is faster than classic rendering, although it will consume more memory and lose progressive rendering. In cases where memory pressure is a high concern, or where progressive rendering is required, classic mode should be used.
-}
+
+@_functools.lru_cache(maxsize=4096)
+def _nuke_command(flags: _Tuple[str, ...], frange: str, nodes: _Tuple[str, ...], script: str) -> _Tuple[str, ...]:
+    """Compile the nuke command line, the chunks of a render only differ by frame range.
+
+    Args:
+        flags (Tuple[str, ...]): The enabled flags.
+        frange (str): The frame range, each part is passed with its own -F.
+        nodes (Tuple[str, ...]): The node names to render, every write node is rendered without any.
+        script (str): The path to the nuke script.
+
+    Returns:
+        Tuple[str, ...]: The command.
+    """
+    command = ["nuke-race", "-t"]
+    # Set the script frange and nodes execution, -x executes every write node and -X only the given nodes
+    command.extend(flags if nodes else ("-x",) + flags)
+    for frange_part in frange.replace(",", " ").split():
+        command.extend(["-F", frange_part])
+    if nodes:
+        command.extend(["-X", ",".join(nodes)])
+    command.extend(["--", script])
+    return tuple(command)
 
 
 @_dataclasses.dataclass(eq=True, order=True)
@@ -32,12 +52,13 @@ class NukeOperation(_rifs.core.ProcessorRif):
     us to successfully render a nuke script on the farm.
 
     Attributes:
-        script (str): The path to the nuke script to render.
+        script (str): The path to the nuke script to render, an input of the memoized fingerprint.
         nodes (List[str]): A list of node names to render.
         frange (str): The frame range to render. Accepts:
                       'A'        single frame number A
                       'A-B'      all frames from A through B
                       'A-BxC'    every C'th frame from A to last one less or equal to B
+                      'A B C'    a list of any of the above, each one is passed with its own -F
         gpu (bool): Enable GPU usage when in terminal mode with an optional gpu index argument, defaults to 0 if none given. Will override preferences when in interactive mode.
         render_order (bool): Force the application to obey the render order of Write nodes such that Reads can use files created by earlier Write nodes.
         interactive (bool): With -x or -t use interactive, not render, license.
@@ -58,45 +79,246 @@ class NukeOperation(_rifs.core.ProcessorRif):
 
     """
 
-    script: str = _dataclasses.field(default_factory=str)
+    script: str = _dataclasses.field(default_factory=str, metadata={"input": True})
     nodes: _List[str] = _dataclasses.field(default_factory=list)
     frange: str = _dataclasses.field(default_factory=str)
 
     # # Optional
-    gpu: bool = _dataclasses.field(default=False)
-    render_order: bool = _dataclasses.field(default=False, repr=False)
-    interactive: bool = _dataclasses.field(default=False, repr=False)
-    proxy_mode: bool = _dataclasses.field(default=False, repr=False)
-    full_size: bool = _dataclasses.field(default=False, repr=False)
-    not_writes: bool = _dataclasses.field(default=False, repr=False)
-    classic_rendering: bool = _dataclasses.field(default=False)
-    topdown: bool = _dataclasses.field(default=False)
+    gpu: bool = _dataclasses.field(default=False, metadata={"flag": "--gpu"})
+    render_order: bool = _dataclasses.field(default=False, repr=False, metadata={"flag": "--sro"})
+    interactive: bool = _dataclasses.field(default=False, repr=False, metadata={"flag": "-i"})
+    proxy_mode: bool = _dataclasses.field(default=False, repr=False, metadata={"flag": "-p"})
+    full_size: bool = _dataclasses.field(default=False, repr=False, metadata={"flag": "-f"})
+    not_writes: bool = _dataclasses.field(default=False, repr=False, metadata={"flag": "--rendertonull"})
+    classic_rendering: bool = _dataclasses.field(default=False, metadata={"flag": "--classic_rendering"})
+    topdown: bool = _dataclasses.field(default=False, metadata={"flag": "--topdown"})
 
-    command: _List[str] = _dataclasses.field(default_factory=lambda: ["nuke-race", "-t", "-x"], init=False)
+    command: _List[str] = _dataclasses.field(default_factory=list, init=False)
+    # The notes given by the user, before the post init decorates them with the script and frame range
+    user_notes: str = _dataclasses.field(default="", init=False, repr=False, compare=False, metadata={"exempt": True})
+    # The operation the chunk was split from, lets the resolver map the dependencies onto the chunks
+    chunk_source: _Optional["NukeOperation"] = _dataclasses.field(
+        default=None, init=False, repr=False, compare=False, metadata={"exempt": True}
+    )
 
     def __post_init__(self):
         self.script = str(self.script)  # Ensure the script is a string
+        self.user_notes = self.notes
         self.notes = f"Nuke | {_os.path.basename(self.script)} | {self.frange} | {self.notes or 'NA'}"
         self.soumission_kwargs["outputImage"] = self.script
         self.soumission_kwargs["frame_range"] = self.frange
         self.build_command()
 
     def build_command(self) -> bool:
-        """Build the nuke command from the object attributes.
+        """Build the nuke command from the object attributes, calling it again rebuilds the same command.
 
         Returns:
             bool: True if the command was successfully built.
         """
-        # Mapping the flags to the command if enabled
-        for key in _dataclasses.asdict(self):
-            if key in FLAG_MAPPING and getattr(self, key):
-                self.command.append(FLAG_MAPPING[key])
-
-        # Set the script frange and nodes execution
-        if self.frange:
-            self.command.extend(["-F", self.frange])
-        if self.nodes:
-            self.command.remove("-x")
-            self.command.extend(["-X", ",".join(self.nodes)])
-        self.command.extend(["--", self.script])
+        self.command = list(_nuke_command(self.command_flags(), self.frange, tuple(self.nodes), self.script))
         return True
+
+    def history_key(self) -> str:
+        """Return the key of the runtime history, the same script and write nodes render alike.
+
+        Returns:
+            str: The script path and the sorted node names, * for every write node.
+        """
+        return f"{self.script}|{','.join(sorted(self.nodes)) or '*'}"
+
+    def adaptive_chunk(
+        self,
+        history: "_history.RuntimeHistory",
+        target_seconds: float = 1800.0,
+        default_batch_size: int = 10,
+    ) -> _List["NukeOperation"]:
+        """Chunk the operation so each chunk runs close to the target duration, and reserve the cpus and
+        ram the previous renders of the script needed.
+
+        Args:
+            history (RuntimeHistory): The runtime history.
+            target_seconds (float, optional): The target seconds per chunk. Defaults to 1800.0, 30 minutes.
+            default_batch_size (int, optional): The batch size without any history. Defaults to 10.
+
+        Returns:
+            List[NukeOperation]: The chunk operations, the operation itself if there is nothing to split or
+                                 its frame range can't be parsed.
+        """
+        try:
+            frame_count = len(_frames.parse_frange(self.frange))
+        except ValueError:
+            _logger.warning("Can't parse the frame range %r of %s, rendering it in one job.", self.frange, self.name)
+            return [self]
+        estimate = history.estimate(self.history_key())
+        if estimate is None:
+            _logger.info("No runtime history for %s, chunking by %s frames.", self.history_key(), default_batch_size)
+            return self.chunk(default_batch_size)
+
+        chunks = self.chunk(_history.batch_size(estimate.frame_seconds, target_seconds, frame_count))
+        cpus, ram = _history.job_resources(estimate)
+        for chunk in chunks:
+            chunk.soumission_kwargs.update(cpus=cpus, ram=ram)
+        return chunks
+
+    def chunk(self, batch_size: int) -> _List["NukeOperation"]:
+        """Split the operation into chunk operations of the batch size frames, so the render spreads
+        across many farm slots. The operations depending on this one depend on its chunks once resolved,
+        through frame_depend_on only on the chunks rendering their frames.
+
+        Args:
+            batch_size (int): The number of frames per chunk.
+
+        Returns:
+            List[NukeOperation]: The chunk operations, the operation itself if there is nothing to split.
+        """
+        frames = _frames.parse_frange(self.frange)
+        frame_chunks = _frames.chunk_frames(frames, batch_size)
+        if len(frame_chunks) < 2:
+            return [self]
+
+        chunks = []
+        for index, frame_chunk in enumerate(frame_chunks, start=1):
+            chunk = _dataclasses.replace(
+                self,
+                frange=_frames.format_frames(frame_chunk),
+                notes=_join_notes(self.user_notes, f"chunk {index}/{len(frame_chunks)}"),
+                depend_on=list(self.depend_on),
+                frame_depend_on=list(self.frame_depend_on),
+                soumission_kwargs=dict(self.soumission_kwargs),
+                temporary_directory="",
+            )
+            chunk.chunk_source = self.chunk_source or self
+            chunks.append(chunk)
+
+        return chunks
+
+    def failed_frames(self, frame_status: _Mapping[int, _Any]) -> _List[int]:
+        """Find the frames of the frame range that didn't render.
+
+        Args:
+            frame_status (Mapping[int, Any]): The status of each frame of the finished job, either a status
+                                              string or a bool. A frame missing from it never rendered.
+
+        Returns:
+            List[int]: The sorted frames to render again.
+        """
+        return [
+            frame
+            for frame in _frames.parse_frange(self.frange)
+            if not _frame_done(frame_status.get(frame, frame_status.get(str(frame))))
+        ]
+
+    def retry(self, frame_status: _Mapping[int, _Any], attempt: int = 1) -> _Optional["NukeOperation"]:
+        """Create the operation rendering only the failed frames, the frame range holds the fewest runs
+        covering them so each run is passed with its own -F.
+
+        Args:
+            frame_status (Mapping[int, Any]): The status of each frame of the finished job.
+            attempt (int, optional): The retry attempt, for the notes. Defaults to 1.
+
+        Returns:
+            NukeOperation: The retry operation, None if every frame rendered.
+        """
+        failed = self.failed_frames(frame_status)
+        if not failed:
+            return None
+        # The original job already waited on its dependencies, the retry goes out on its own
+        return _dataclasses.replace(
+            self,
+            frange=_frames.format_frames(failed),
+            notes=_join_notes(self.user_notes, f"retry {attempt} of {len(failed)} frames"),
+            depend_on=[],
+            frame_depend_on=[],
+            soumission_kwargs=dict(self.soumission_kwargs),
+            temporary_directory="",
+        )
+
+
+def _join_notes(user_notes: str, notes: str) -> str:
+    """Append the notes of a derived operation to the notes of the user.
+
+    Args:
+        user_notes (str): The notes given by the user, can be empty.
+        notes (str): The notes of the derived operation.
+
+    Returns:
+        str: The joined notes.
+    """
+    return f"{user_notes} | {notes}" if user_notes else notes
+
+
+def _frame_done(status: _Any) -> bool:
+    """Check if the per frame status is a rendered frame.
+
+    Args:
+        status (Any): The status string or bool, None if the frame has no status.
+
+    Returns:
+        bool: True if the frame rendered.
+    """
+    if isinstance(status, str):
+        return status.lower() in _DONE_STATUSES
+    return status is True
+
+
+def retry_failed_frames(
+    operation: NukeOperation,
+    frame_status: _Mapping[int, _Any],
+    render: _Callable[[NukeOperation], _Mapping[int, _Any]],
+    attempts: int = 3,
+    backoff: float = 30.0,
+    max_backoff: float = 900.0,
+) -> _Dict[int, _Any]:
+    """Render the failed frames of a finished render again until they all render or the attempts run out,
+    waiting twice as long before each attempt.
+
+    Args:
+        operation (NukeOperation): The finished render.
+        frame_status (Mapping[int, Any]): The status of each frame of the finished render.
+        render (Callable[[NukeOperation], Mapping[int, Any]]): Render the retry operation and return the
+                                                              status of its frames.
+        attempts (int, optional): The maximum number of retries. Defaults to 3.
+        backoff (float, optional): The seconds to wait before the first retry. Defaults to 30.0.
+        max_backoff (float, optional): The most seconds to wait before a retry. Defaults to 900.0.
+
+    Returns:
+        Dict[int, Any]: The status of each frame once retried, frames that kept failing keep their last status.
+
+    Examples:
+        >>> status = retry_failed_frames(nuke_render, {1001: "done", 1002: "failed"}, render=farm_render)
+    """
+    status: _Dict[int, _Any] = {int(frame): state for frame, state in frame_status.items()}
+    for attempt in range(1, attempts + 1):
+        retry_operation = operation.retry(status, attempt)
+        if retry_operation is None:
+            break
+        delay = min(backoff * 2 ** (attempt - 1), max_backoff)
+        _logger.info(
+            "Retrying frames %s of %s in %s seconds, attempt %s of %s.",
+            retry_operation.frange,
+            operation.script,
+            delay,
+            attempt,
+            attempts,
+        )
+        _time.sleep(delay)
+        status.update((int(frame), state) for frame, state in render(retry_operation).items())
+    else:
+        failed = operation.failed_frames(status)
+        if failed:
+            _logger.warning(
+                "Frames %s of %s still failed after %s retries.",
+                _frames.format_frames(failed),
+                operation.script,
+                attempts,
+            )
+
+    return status
+
+
+# The flag of each optional field, declared in the field metadata
+FLAG_MAPPING = {
+    nuke_field.name: nuke_field.metadata["flag"]
+    for nuke_field in _dataclasses.fields(NukeOperation)
+    if "flag" in nuke_field.metadata
+}
@@ -0,0 +1,292 @@
+"""The local Nuke render server keeps a pool of warm Nuke workers with the script already loaded, the
+chunks of a local render are fed to them instead of paying the Nuke startup and script load per chunk.
+"""
+
+import dataclasses as _dataclasses
+import json as _json
+import logging as _logging
+import queue as _queue
+import subprocess as _subprocess
+import sys as _sys
+import threading as _threading
+import typing as _typing
+
+# Package imports
+from rifs.core import frames as _frames
+from rifs.core.history import RuntimeHistory as _RuntimeHistory
+from rifs.operations import render_worker as _render_worker
+from rifs.operations.ruke import NukeOperation as _NukeOperation
+
+__all__ = ["frame_status", "NukeRenderServer", "RenderResult", "render_locally"]
+
+
+_logger = _logging.getLogger("dd." + __name__)
+_logger.addHandler(_logging.NullHandler())
+
+
+@_dataclasses.dataclass
+class RenderResult:
+    """The result of a chunk rendered by the render server.
+
+    Attributes:
+        operation (NukeOperation): The rendered chunk.
+        status (str): Either ok or error.
+        error (str): The error message of a failed chunk.
+        seconds (float): The seconds the worker spent rendering the chunk.
+    """
+
+    operation: "_NukeOperation"
+    status: str
+    error: str = ""
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        """bool: True if the chunk rendered."""
+        return self.status == "ok"
+
+
+class _Worker:
+    """A warm Nuke process of the render server."""
+
+    def __init__(self, command: _typing.List[str]) -> None:
+        self.process = _subprocess.Popen(
+            command, stdin=_subprocess.PIPE, stdout=_subprocess.PIPE, text=True, bufsize=1, encoding="utf-8"
+        )
+
+    def receive(self) -> _typing.Dict[str, _typing.Any]:
+        """Read the stdout until the next response, skipping the Nuke output.
+
+        Returns:
+            Dict[str, Any]: The response, an error response if the worker exited.
+        """
+        for line in iter(self.process.stdout.readline, ""):  # type: ignore[union-attr]
+            if line.startswith(_render_worker.RESPONSE_PREFIX):
+                return _json.loads(line[len(_render_worker.RESPONSE_PREFIX) :])
+        return {"status": "error", "error": f"The render worker exited with {self.process.wait()}."}
+
+    def send(self, request: _typing.Dict[str, _typing.Any]) -> bool:
+        """Write a request line to the worker.
+
+        Args:
+            request (Dict[str, Any]): The request.
+
+        Returns:
+            bool: False if the worker is gone.
+        """
+        try:
+            self.process.stdin.write(_json.dumps(request) + "\n")  # type: ignore[union-attr]
+            self.process.stdin.flush()  # type: ignore[union-attr]
+        except (BrokenPipeError, OSError, ValueError):
+            return False
+        return True
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Ask the worker to quit, kill it if it doesn't.
+
+        Args:
+            timeout (float, optional): The seconds to wait for the worker to quit. Defaults to 10.0.
+        """
+        self.send({"quit": True})
+        try:
+            self.process.stdin.close()  # type: ignore[union-attr]
+        except OSError:
+            pass
+        try:
+            self.process.wait(timeout)
+        except _subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self.process.stdout.close()  # type: ignore[union-attr]
+
+
+class NukeRenderServer:
+    """Render the chunks of a nuke script on a pool of warm Nuke workers.
+
+    Attributes:
+        script (str): The path to the nuke script, loaded once per worker.
+        workers (int): The number of Nuke workers.
+        command (List[str]): The command starting the Nuke interpreter, the worker script and the nuke
+                             script are appended.
+        flags (Tuple[str, ...]): The command line flags of the chunks, like --gpu or -p, given to the Nuke
+                                 interpreter of every worker.
+        fake (bool): Start the stand in workers that don't need Nuke or a license, they ignore the flags.
+
+    Examples:
+        >>> chunks = NukeOperation(script="/path/to/comp.nk", frange="1001-1100").chunk(10)
+        >>> with NukeRenderServer("/path/to/comp.nk", workers=4) as server:
+        ...     results = server.render(chunks)
+    """
+
+    def __init__(
+        self,
+        script: str,
+        workers: int = 2,
+        command: _typing.Optional[_typing.List[str]] = None,
+        flags: _typing.Sequence[str] = (),
+        fake: bool = False,
+    ) -> None:
+        self.script = str(script)
+        self.workers = max(workers, 1)
+        self.flags = tuple(flags)
+        self.fake = fake
+        self.command = list(command or ([_sys.executable] if fake else ["nuke", "-t"]))
+        self._workers: _typing.List[_Worker] = []
+
+    def __enter__(self) -> "NukeRenderServer":
+        self.start()
+        return self
+
+    def __exit__(self, *_: _typing.Any) -> None:
+        self.close()
+
+    def start(self) -> bool:
+        """Start the workers and wait for them to load the script.
+
+        Raises:
+            RuntimeError: If a worker failed to load the script.
+
+        Returns:
+            bool: True once every worker is ready.
+        """
+        self._workers = [_Worker(self._worker_command()) for _ in range(self.workers)]
+        # The workers load the script at the same time, only wait on them afterwards
+        for worker in self._workers:
+            response = worker.receive()
+            if response["status"] != "ready":
+                self.close()
+                raise RuntimeError(f"The render worker failed to load {self.script}: {response.get('error')}")
+        _logger.info("Started %s render workers for %s.", len(self._workers), self.script)
+        return True
+
+    def _worker_command(self) -> _typing.List[str]:
+        """Return the command starting a worker, the flags go to the Nuke interpreter.
+
+        Returns:
+            List[str]: The command.
+        """
+        if self.fake:
+            return self.command + [_render_worker.__file__, "--fake", self.script]
+        return self.command + list(self.flags) + [_render_worker.__file__, self.script]
+
+    def close(self) -> None:
+        """Stop the workers."""
+        for worker in self._workers:
+            worker.close()
+        self._workers = []
+
+    def render(self, operations: _typing.Sequence["_NukeOperation"]) -> _typing.List[RenderResult]:
+        """Render the chunks on the workers, each worker picks the next chunk as soon as it's free.
+
+        Args:
+            operations (Sequence[NukeOperation]): The chunks of the server script.
+
+        Raises:
+            ValueError: If a chunk renders another script, has other flags or has no frame range.
+            RuntimeError: If the server isn't started.
+
+        Returns:
+            List[RenderResult]: The result of each chunk, in the order of the operations.
+        """
+        if not self._workers:
+            raise RuntimeError("The render server isn't started.")
+        for operation in operations:
+            if operation.script != self.script or operation.command_flags() != self.flags or not operation.frange:
+                raise ValueError(f"Can't render {operation.notes} on the render server of {self.script}.")
+
+        pending: "_queue.Queue[int]" = _queue.Queue()
+        for index in range(len(operations)):
+            pending.put(index)
+        results: _typing.List[_typing.Optional[RenderResult]] = [None] * len(operations)
+
+        def dispatch(worker: _Worker) -> None:
+            while True:
+                try:
+                    index = pending.get_nowait()
+                except _queue.Empty:
+                    return
+                operation = operations[index]
+                request = {
+                    "id": index,
+                    "nodes": list(operation.nodes),
+                    "ranges": _frames.frame_runs(_frames.parse_frange(operation.frange)),
+                }
+                response = worker.receive() if worker.send(request) else {"status": "error", "error": "Worker gone."}
+                results[index] = RenderResult(
+                    operation, response["status"], response.get("error", ""), response.get("seconds", 0.0)
+                )
+                if response.get("id") != index:
+                    # The worker died, leave the remaining chunks to the others
+                    _logger.warning("A render worker of %s exited: %s", self.script, response.get("error"))
+                    return
+
+        threads = [_threading.Thread(target=dispatch, args=(worker,), daemon=True) for worker in self._workers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Every worker died before these chunks were picked up
+        return [
+            result or RenderResult(operations[index], "error", "No render worker left.")
+            for index, result in enumerate(results)
+        ]
+
+
+def render_locally(
+    operations: _typing.Sequence["_NukeOperation"],
+    workers: int = 2,
+    history: _typing.Optional["_RuntimeHistory"] = None,
+    **server_kwargs: _typing.Any,
+) -> _typing.List[RenderResult]:
+    """Render the chunked operations on one render server per nuke script and flags.
+
+    Args:
+        operations (Sequence[NukeOperation]): The chunks to render.
+        workers (int, optional): The number of Nuke workers per script. Defaults to 2.
+        history (RuntimeHistory, optional): Record the seconds per frame of the rendered chunks.
+                                            Defaults to None.
+
+    Keyword Args:
+        command (List[str]): The command starting the Nuke interpreter.
+        fake (bool): Start the stand in workers that don't need Nuke or a license.
+
+    Returns:
+        List[RenderResult]: The result of each chunk, in the order of the operations.
+    """
+    indices_by_server: _typing.Dict[_typing.Tuple[str, _typing.Tuple[str, ...]], _typing.List[int]] = {}
+    for index, operation in enumerate(operations):
+        indices_by_server.setdefault((operation.script, operation.command_flags()), []).append(index)
+
+    results: _typing.List[_typing.Optional[RenderResult]] = [None] * len(operations)
+    for (script, flags), indices in indices_by_server.items():
+        with NukeRenderServer(script, workers=workers, flags=flags, **server_kwargs) as server:
+            for index, result in zip(indices, server.render([operations[index] for index in indices])):
+                results[index] = result
+                if history is not None and result.ok:
+                    frame_count = len(_frames.parse_frange(result.operation.frange))
+                    history.record(result.operation.history_key(), result.seconds, frame_count)
+
+    return _typing.cast(_typing.List[RenderResult], results)
+
+
+def frame_status(results: _typing.Iterable[RenderResult]) -> _typing.Dict[int, str]:
+    """Spread the status of the rendered chunks onto their frames, for the retry of the failed frames.
+
+    Notes:
+        A worker stops a chunk at its first failed frame, so every frame of a failed chunk is failed.
+
+    Args:
+        results (Iterable[RenderResult]): The results of the chunks.
+
+    Returns:
+        Dict[int, str]: The status of each frame, either done or failed.
+
+    Examples:
+        >>> retry_failed_frames(render, frame_status(results), lambda retry: frame_status(render_locally([retry])))
+    """
+    status: _typing.Dict[int, str] = {}
+    for result in results:
+        state = "done" if result.ok else "failed"
+        status.update((frame, state) for frame in _frames.parse_frange(result.operation.frange))
+    return status
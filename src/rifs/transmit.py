@@ -2,46 +2,213 @@
 files for farm submission.
 """
 
+import asyncio as _asyncio
+import contextlib as _contextlib
 import dataclasses as _dataclasses
+import functools as _functools
 import logging as _logging
+import os as _os
 import typing as _typing
 
+from concurrent import futures as _futures
+
 # Internal imports
+from rifs.core import runner as _runner
+from rifs.core.instrument import sidecar_path as _sidecar_path
 from rifs.core.soumission import _Job
-from rifs.core.transmission import generate_script as _generate_script
-from rifs.core import AbstractRif as _AbstractRif, insert_job as _insert_job
-from rifs.core.resolver import Resolver as _Resolver
+from rifs.core.transmission import generate_manifest as _generate_manifest, generate_script as _generate_script
+from rifs.core import AbstractRif as _AbstractRif, ProcessorRif as _ProcessorRif, insert_job as _insert_job
+from rifs.core.memo import MemoStore as _MemoStore
+from rifs.core.packing import fuse as _fuse, pack as _pack
+from rifs.core.resolver import Grouping as _Grouping, Resolver as _Resolver
+from rifs.core.scheduler import JobReport as _JobReport, LocalScheduler as _LocalScheduler
 
 
 
-__all__ = ["Constructor"]
+__all__ = ["Constructor", "only_one", "only_one_async"]
 
 
 _logger = _logging.getLogger("dd." + __name__)
 _logger.addHandler(_logging.NullHandler())
 
+# The operation and job of each built rif object
+_BuiltJobs = _typing.Generator[_typing.Tuple[_typing.Any, "_Job"], None, None]
+
 
 @_dataclasses.dataclass(eq=True, order=True, frozen=True)
 class Constructor:
-    """Turn a rif object into a executable python file for farm submission."""
+    """Turn a rif object into a executable python file for farm submission.
+
+    Attributes:
+        operations (List[AbstractRif]): The operations to submit.
+        manifest (bool): Write one manifest for the whole submission and run every operation through
+                         the shared runner, instead of generating a script per operation.
+        workers (int): Generate the scripts and jobs on a thread pool of this size, the file writes on the
+                       shared mount overlap instead of waiting on each other. Defaults to 0, serial.
+        instrument (bool): Record the import time, call wall and cpu time, peak memory and exit status of each
+                           python operation into a json sidecar in its temporary directory.
+        memo (MemoStore): Skip the operations whose fingerprint and outputs are recorded in the store, the
+                          operations depending on them don't wait for them. A farm submission records its
+                          operations with record_memo. Defaults to None, run everything.
+        pack (int): Pack up to this many sibling operations with the same dependencies and resources into a
+                    single job, see rifs.core.packing. Defaults to 0, one job per operation. The streaming
+                    submission doesn't pack.
+        pack_workers (int): The number of operations a packed job runs at once. Defaults to 1, in order.
+        fuse (bool): Fuse the linear chains of python operations into single jobs running the steps back to
+                     back, see rifs.core.packing. The streaming submission doesn't fuse.
+    """
 
     operations: _typing.List["_AbstractRif"]
+    manifest: bool = False
+    workers: int = 0
+    memo: _typing.Optional["_MemoStore"] = None
+    instrument: bool = False
+    pack: int = 0
+    pack_workers: int = 1
+    fuse: bool = False
 
-    def submit(self, ignore: bool = False) -> _typing.List[_typing.Tuple[str, str]]:
+    def submit(
+        self, ignore: bool = False, concurrency: int = 1, stream: bool = False
+    ) -> _typing.List[_typing.Tuple[str, str]]:
         """Submit all the grouping jobs to the farm.
 
         Args:
             ignore (bool, optional): The resolve looks to see if the jobs are enlist in the grouping.
                                      This is a flag to ignore the depend_on. Defaults to False.
+            concurrency (int, optional): The maximum number of jobs handed to the farm at once. The jobs are
+                                         submitted in dependency waves, a wave only starts once the jobs it
+                                         depends on are submitted. Defaults to 1, one after another.
+            stream (bool, optional): Submit each job as soon as it's built and the jobs it depends on are
+                                     submitted, instead of building everything first. Defaults to False.
         Returns:
             _typing.List[_typing.Tuple[str, str]]: The list of the job name and the job id.
         """
-        results: _typing.List[_typing.Tuple[str, str]] = []
+        if stream:
+            return self._submit_stream(ignore, concurrency)
+        resolved = self._resolve(self.build(), ignore)
+        if concurrency <= 1:
+            return [grouping.job.submit() for grouping in resolved]
+
+        submitted: _typing.Dict["_Grouping", _typing.Tuple[str, str]] = {}
+        with _futures.ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="rifs-submit") as executor:
+            for wave in resolved.waves():
+                for grouping, result in zip(wave, executor.map(lambda grouping: grouping.job.submit(), wave)):
+                    submitted[grouping] = result
+
+        # Keep the resolved order of the results
+        return [submitted[grouping] for grouping in resolved]
+
+    def _submit_stream(self, ignore: bool, concurrency: int) -> _typing.List[_typing.Tuple[str, str]]:
+        """Submit the groupings while they are streamed from the build.
+
+        Args:
+            ignore (bool): Ignore the depend_on missing from the submission.
+            concurrency (int): The maximum number of jobs handed to the farm at once.
+
+        Returns:
+            _typing.List[_typing.Tuple[str, str]]: The list of the job name and the job id, in streamed order.
+        """
+        if concurrency <= 1:
+            return [grouping.job.submit() for grouping in self.stream(ignore=ignore)]
 
-        for grouping in self.build().resolve(ignore=ignore):
-            results.append(grouping.job.submit())
+        def submit_job(grouping: "_Grouping", parents: _typing.List[_futures.Future]) -> _typing.Tuple[str, str]:
+            # The parents were queued first, so they are already running or done
+            for parent in parents:
+                parent.result()
+            return grouping.job.submit()
 
-        return results
+        submissions: _typing.Dict[int, _futures.Future] = {}
+        with _futures.ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="rifs-submit") as executor:
+            for grouping in self.stream(ignore=ignore):
+                parents = [submissions[id(job)] for job in grouping.job.depend_on if id(job) in submissions]
+                submissions[id(grouping.job)] = executor.submit(submit_job, grouping, parents)
+
+        return [submission.result() for submission in submissions.values()]
+
+    async def submit_async(
+        self, ignore: bool = False, concurrency: int = 8, timeout: _typing.Optional[float] = None
+    ) -> _typing.List[_typing.Tuple[str, str]]:
+        """Submit all the grouping jobs to the farm from an event loop.
+
+        Notes:
+            Jobs with a submit_async coroutine, like the local job, run as asyncio subprocesses. Other jobs
+            are submitted from a worker thread, a timeout or cancellation can't interrupt those.
+
+        Args:
+            ignore (bool, optional): The resolve looks to see if the jobs are enlist in the grouping.
+                                     This is a flag to ignore the depend_on. Defaults to False.
+            concurrency (int, optional): The maximum number of jobs submitted at once. Defaults to 8.
+            timeout (float, optional): The seconds allowed per job submission. Defaults to None, no limit.
+
+        Raises:
+            asyncio.TimeoutError: If a job submission ran longer than the timeout.
+
+        Returns:
+            _typing.List[_typing.Tuple[str, str]]: The list of the job name and the job id.
+        """
+        # The build writes the scripts and the packs, keep the file writes off the event loop
+        resolved = await _asyncio.get_running_loop().run_in_executor(None, lambda: self._resolve(self.build(), ignore))
+        semaphore = _asyncio.Semaphore(max(concurrency, 1))
+
+        async def submit_job(grouping: "_Grouping") -> _typing.Tuple[str, str]:
+            async with semaphore:
+                if hasattr(grouping.job, "submit_async"):
+                    return await grouping.job.submit_async(timeout=timeout)
+                submission = _asyncio.get_running_loop().run_in_executor(None, grouping.job.submit)
+                return await _asyncio.wait_for(submission, timeout)
+
+        submitted: _typing.Dict["_Grouping", _typing.Tuple[str, str]] = {}
+        for wave in resolved.waves():
+            tasks = [_asyncio.ensure_future(submit_job(grouping)) for grouping in wave]
+            try:
+                results = await _asyncio.gather(*tasks)
+            except BaseException:
+                # A failed or cancelled wave cancels its remaining jobs
+                for task in tasks:
+                    task.cancel()
+                await _asyncio.gather(*tasks, return_exceptions=True)
+                raise
+            submitted.update(zip(wave, results))
+
+        # Keep the resolved order of the results
+        return [submitted[grouping] for grouping in resolved]
+
+    def run_local(
+        self, ignore: bool = False, scheduler: _typing.Optional["_LocalScheduler"] = None
+    ) -> _typing.List["_JobReport"]:
+        """Run all the grouping jobs on this workstation instead of the farm.
+
+        Args:
+            ignore (bool, optional): The resolve looks to see if the jobs are enlist in the grouping.
+                                     This is a flag to ignore the depend_on. Defaults to False.
+            scheduler (LocalScheduler, optional): The scheduler with the cpus and ram budget.
+                                                  Defaults to the whole workstation, recording into the memo.
+
+        Returns:
+            List[JobReport]: The report of each job, in resolved order.
+        """
+        return (scheduler or _LocalScheduler(memo=self.memo)).run(self._resolve(self.build(), ignore))
+
+    def record_memo(self) -> _typing.List[str]:
+        """Record the operations whose declared outputs all exist into the memo store, so the next build
+        skips them.
+
+        Notes:
+            The farm jobs don't write to the store of the workstation, call this once the farm submission
+            finished. run_local records the operations that succeeded on its own.
+
+        Returns:
+            List[str]: The fingerprints of the recorded operations.
+        """
+        if self.memo is None:
+            return []
+        return [
+            self.memo.record(operation)
+            for operation in self.operations
+            if isinstance(operation, _AbstractRif)
+            and operation.outputs
+            and all(_os.path.exists(output) for output in operation.outputs)
+        ]
 
     def build(self) -> "_Resolver":
         """Turn the rif objects into a executable python file for farm submission.
@@ -49,32 +216,167 @@ class Constructor:
         Returns:
             Resolver: The resolver object.
         """
+        rifs_resolver, _, built_jobs = self._build_jobs()
+        with _contextlib.closing(built_jobs):
+            for operation, rif_job_soumission in built_jobs:
+                # Inject the job into the resolver
+                _logger.info("Injecting job %s into the resolver.", rif_job_soumission.job_name)
+                rifs_resolver.inject(operation, rif_job_soumission)
+
+        return rifs_resolver
+
+    def _resolve(self, rifs_resolver: "_Resolver", ignore: bool) -> "_Resolver":
+        """Resolve the built resolver, then fuse the chains and pack the sibling operations if enabled.
+
+        Args:
+            rifs_resolver (Resolver): The built resolver.
+            ignore (bool): Ignore the depend_on missing from the submission.
+
+        Returns:
+            Resolver: The resolved resolver.
+        """
+        resolved = rifs_resolver.resolve(ignore=ignore)
+        if self.fuse:
+            resolved = _fuse(resolved, self.instrument)
+        if self.pack > 1:
+            resolved = _pack(resolved, self.pack, self.pack_workers)
+        return resolved
+
+    def stream(self, ignore: bool = False) -> _typing.Iterator["_Grouping"]:
+        """Build the jobs and yield each grouping as soon as its job is built and everything it depends on
+        was yielded, the first jobs can be submitted while the rest are still building.
+
+        Args:
+            ignore (bool, optional): The resolve looks to see if the jobs are enlist in the grouping.
+                                     This is a flag to ignore the depend_on. Defaults to False.
+
+        Raises:
+            ResolverCycleError: If the depend_on graph contains a cycle.
+
+        Yields:
+            Grouping: The resolved grouping objects.
+        """
+        rifs_resolver, operations, built_jobs = self._build_jobs()
+        expected = [operation for operation in operations if isinstance(operation, (_Job, _AbstractRif))]
+        with _contextlib.closing(built_jobs):
+            groupings = (_Grouping(operation, rif_job_soumission) for operation, rif_job_soumission in built_jobs)
+            yield from rifs_resolver.resolve_stream(groupings, expected, ignore=ignore)
+
+    def _build_jobs(self) -> _typing.Tuple["_Resolver", _typing.List[_typing.Any], _BuiltJobs]:
+        """Skip the up to date operations and lazily build the jobs of the others, in operations order.
+
+        Returns:
+            Tuple[Resolver, List[Any], Generator]: The resolver with the skipped operations, the operations to
+                                                   build, and the operation and job of each valid rif object
+                                                   as soon as they are built.
+        """
         rifs_resolver = _Resolver()
+        # Write the manifest once up front, the op id is the position in the operations
+        manifest_path = ""
+        if self.manifest:
+            manifest_path = _generate_manifest(
+                {
+                    str(index): operation
+                    for index, operation in enumerate(self.operations)
+                    if issubclass(type(operation), _AbstractRif)
+                }
+            )
+
+        up_to_date = self._up_to_date()
+        indices = []
+        for index, operation in enumerate(self.operations):
+            if id(operation) in up_to_date:
+                _logger.info("Skipping %s. Its outputs are up to date.", operation.name or type(operation).__name__)
+                rifs_resolver.skip(operation)
+                continue
+            indices.append(index)
+        operations = [self.operations[index] for index in indices]
+        build_job = _functools.partial(self._build_job, manifest_path=manifest_path, instrument=self.instrument)
 
+        def built_jobs() -> _BuiltJobs:
+            if self.workers > 1:
+                # The executor map keeps the input order, the resolver is still injected deterministically
+                with _futures.ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="rifs-build") as executor:
+                    yield from filter(None, executor.map(build_job, indices, operations))
+            else:
+                yield from filter(None, map(build_job, indices, operations))
+
+        return rifs_resolver, operations, built_jobs()
+
+    def _up_to_date(self) -> _typing.Set[int]:
+        """Find the operations the memo store can skip, an operation only stays skipped while everything it
+        depends on in this submission is skipped too.
+
+        Returns:
+            Set[int]: The identities of the operations to skip.
+        """
+        if self.memo is None:
+            return set()
+        # A dependency references either an operation or the source of its chunks
+        members: _typing.Dict[int, _typing.List[int]] = {}
         for operation in self.operations:
+            members.setdefault(id(operation), []).append(id(operation))
+            chunk_source = getattr(operation, "chunk_source", None)
+            if chunk_source is not None:
+                members.setdefault(id(chunk_source), []).append(id(operation))
 
-            operation_class_name = operation.__class__.__name__
-            if isinstance(operation, _Job):
-                _logger.info("Injecting job %s into the resolver.", operation_class_name)
-                rifs_resolver.inject(operation=operation, job=operation)
-                continue
-            if not issubclass(type(operation), _AbstractRif):
-                _logger.info("Skipping %s. Not a valid rif object.", operation)
-                continue
-            # Generate the script if its an abstract rif
-            temp_script_path = _generate_script(operation)
-            _logger.info(
-                "Generated script %s for %s. Will skip if its a processor rif",
-                temp_script_path or None,
-                operation_class_name,
-            )
-            # Convert the object to job
-            rif_job_soumission = _insert_job(operation, temp_script_path, **operation.soumission_kwargs)
-            # Inject the job into the resolver
-            _logger.info("Injecting job %s into the resolver.", rif_job_soumission.job_name)
-            rifs_resolver.inject(operation, rif_job_soumission)
+        candidates = {
+            id(operation): operation
+            for operation in self.operations
+            if isinstance(operation, _AbstractRif) and self.memo.is_up_to_date(operation)
+        }
+        changed = True
+        while changed:
+            changed = False
+            for operation_id, operation in list(candidates.items()):
+                depend_ons = list(operation.depend_on) + list(operation.frame_depend_on)
+                dependency_ids = (member for depend_on in depend_ons for member in members.get(id(depend_on), []))
+                if any(dependency_id not in candidates for dependency_id in dependency_ids):
+                    del candidates[operation_id]
+                    changed = True
 
-        return rifs_resolver
+        return set(candidates)
+
+    @staticmethod
+    def _build_job(
+        index: int, operation: _typing.Any, manifest_path: str = "", instrument: bool = False
+    ) -> _typing.Optional[_typing.Tuple[_typing.Any, "_Job"]]:
+        """Generate the script and the job of a single operation.
+
+        Args:
+            index (int): The position of the operation, its op id in the manifest.
+            operation (Union[AbstractRif, Job]): The operation object.
+            manifest_path (str, optional): The submission manifest, if built in manifest mode. Defaults to "".
+            instrument (bool, optional): Pass the stats sidecar to the script. Defaults to False.
+
+        Returns:
+            Tuple[Union[AbstractRif, Job], Job]: The operation and its job, None if it's not a valid rif object.
+        """
+        operation_class_name = operation.__class__.__name__
+        if isinstance(operation, _Job):
+            return operation, operation
+        if not issubclass(type(operation), _AbstractRif):
+            _logger.info("Skipping %s. Not a valid rif object.", operation)
+            return None
+        if manifest_path and not isinstance(operation, _ProcessorRif):
+            # Every operation shares the runner, the job only differs by op id
+            rif_job_soumission = _insert_job(operation, _runner.__file__, **operation.soumission_kwargs)
+            rif_job_soumission.command.extend([manifest_path, str(index)])
+            if instrument:
+                rif_job_soumission.command.append(_sidecar_path(operation))
+            return operation, rif_job_soumission
+        # Generate the script if its an abstract rif
+        temp_script_path = _generate_script(operation, instrument=instrument)
+        _logger.info(
+            "Generated script %s for %s. Will skip if its a processor rif",
+            temp_script_path or None,
+            operation_class_name,
+        )
+        # Convert the object to job
+        rif_job_soumission = _insert_job(operation, temp_script_path, **operation.soumission_kwargs)
+        if instrument and temp_script_path:
+            rif_job_soumission.command.append(_sidecar_path(operation))
+        return operation, rif_job_soumission
 
 
 def only_one(operation: _typing.Union[_AbstractRif, _Job]) -> _typing.Tuple[str, str]:
@@ -90,3 +392,21 @@ def only_one(operation: _typing.Union[_AbstractRif, _Job]) -> _typing.Tuple[str,
     if not isinstance(operation, (_AbstractRif, _Job)):
         raise TypeError(f"Only AbstractRif or Job objects are allowed. Got {type(operation)}.")
     return Constructor([operation]).submit()[0]
+
+
+async def only_one_async(
+    operation: _typing.Union[_AbstractRif, _Job], timeout: _typing.Optional[float] = None
+) -> _typing.Tuple[str, str]:
+    """Submit only one job to the farm from an event loop.
+
+    Args:
+        operation (Union[AbstractRif, Job]): The operation to submit.
+        timeout (float, optional): The seconds allowed for the job submission. Defaults to None, no limit.
+
+    Returns:
+        Tuple[str, str]: The job name and the job id.
+    """
+    # Validate the operation
+    if not isinstance(operation, (_AbstractRif, _Job)):
+        raise TypeError(f"Only AbstractRif or Job objects are allowed. Got {type(operation)}.")
+    return (await Constructor([operation]).submit_async(timeout=timeout))[0]
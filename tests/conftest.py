@@ -0,0 +1,33 @@
+"""Shared fixtures of the rifs tests."""
+
+import os
+import sys
+
+import pytest
+
+# Package imports
+from rifs.core import abstraction, constants, transmission
+
+
+@pytest.fixture(autouse=True)
+def temporary_root(tmp_path, monkeypatch):
+    """Write the scripts, manifests and stores of every test into its own temporary directory."""
+    monkeypatch.setattr(constants, "RIF_TEMPORARY_ROOT", str(tmp_path / "farm"))
+    monkeypatch.setattr(constants, "RIF_SCRIPT_STORE_ROOT", str(tmp_path / "farm" / "store"))
+    monkeypatch.setattr(constants, "RIF_LOCAL_STORE_ROOT", str(tmp_path / "cache"))
+    abstraction._session_temporary_path.cache_clear()  # pylint: disable=protected-access
+    abstraction._CREATED_DIRECTORIES.clear()  # pylint: disable=protected-access
+    transmission._render_script.cache_clear()  # pylint: disable=protected-access
+    # The jobs run in their own interpreters, they import rifs and the test operations too
+    monkeypatch.setenv("PYTHONPATH", os.pathsep.join(path for path in sys.path if path))
+    yield tmp_path
+    abstraction._session_temporary_path.cache_clear()  # pylint: disable=protected-access
+    transmission._render_script.cache_clear()  # pylint: disable=protected-access
+
+
+@pytest.fixture(name="script")
+def fixture_script(tmp_path):
+    """An empty nuke script, the fake Nuke workers only check it exists."""
+    script = tmp_path / "comp.nk"
+    script.write_text("", encoding="utf-8")
+    return str(script)
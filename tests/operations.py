@@ -0,0 +1,30 @@
+"""The stand in operations of the rifs tests, importable by the jobs they run."""
+
+import dataclasses
+import os
+
+# Package imports
+import rifs
+
+
+@dataclasses.dataclass
+class Touch(rifs.core.AbstractRif):
+    """Create the file when called.
+
+    Attributes:
+        path (str): The file to create.
+    """
+
+    path: str = ""
+
+    def __call__(self):
+        with open(self.path, "a", encoding="utf-8") as open_file:
+            open_file.write(f"{os.getpid()}\n")
+
+
+@dataclasses.dataclass
+class Fail(rifs.core.AbstractRif):
+    """Raise when called."""
+
+    def __call__(self):
+        raise RuntimeError("Failed on purpose.")
@@ -0,0 +1,45 @@
+"""Tests of the frame by frame dependencies between chunked renders."""
+
+import pytest
+
+# Package imports
+import rifs
+from rifs.operations.ruke import NukeOperation
+
+
+def _parent_franges(resolved, operation):
+    grouping = resolved.find(operation)
+    return sorted(resolved.find(job, job).operation.frange for job in grouping.job.depend_on)
+
+
+def test_chunks_only_depend_on_the_chunks_rendering_their_frames():
+    upstream = NukeOperation(script="/shots/plate.nk", frange="1-8")
+    downstream = NukeOperation(script="/shots/comp.nk", frange="1-8", frame_depend_on=[upstream])
+    upstream_chunks = upstream.chunk(4)
+    downstream_chunks = downstream.chunk(2)
+    resolved = rifs.Constructor(upstream_chunks + downstream_chunks).build().resolve()
+    assert _parent_franges(resolved, downstream_chunks[0]) == ["1-4"]
+    assert _parent_franges(resolved, downstream_chunks[3]) == ["5-8"]
+
+
+def test_depend_on_waits_for_every_chunk():
+    upstream = NukeOperation(script="/shots/plate.nk", frange="1-8")
+    downstream = NukeOperation(script="/shots/comp.nk", frange="1-8", depend_on=[upstream])
+    resolved = rifs.Constructor(upstream.chunk(4) + [downstream]).build().resolve()
+    assert _parent_franges(resolved, downstream) == ["1-4", "5-8"]
+
+
+@pytest.mark.parametrize("frange", ["1100-1001", "1-100x0", "%04d"])
+def test_unparsable_frame_range_is_passed_through(frange):
+    operation = NukeOperation(script="/shots/comp.nk", frange=frange)
+    resolved = rifs.Constructor([operation]).build().resolve()
+    assert resolved.only_operations() == [operation]
+    assert operation.command[3:5] == ["-F", frange]
+
+
+def test_unparsable_frame_range_depends_on_the_whole_operation():
+    upstream = NukeOperation(script="/shots/plate.nk", frange="1-8")
+    downstream = NukeOperation(script="/shots/comp.nk", frange="%04d", frame_depend_on=[upstream])
+    upstream_chunks = upstream.chunk(4)
+    resolved = rifs.Constructor(upstream_chunks + [downstream]).build().resolve()
+    assert _parent_franges(resolved, downstream) == ["1-4", "5-8"]
@@ -0,0 +1,16 @@
+"""Tests of the cost of importing rifs, paid by every farm task."""
+
+# Package imports
+from rifs import benchmark
+
+# The seconds import rifs may take, the lazy package only imports typing
+IMPORT_BUDGET = 0.05
+
+
+def test_import_rifs_stays_within_budget():
+    assert benchmark.check_import(IMPORT_BUDGET) == []
+
+
+def test_import_rifs_core_only_loads_what_is_used():
+    _, modules = benchmark.import_time("rifs.core", repeat=1)
+    assert not [module for module in benchmark.EAGER_MODULES if module in modules]
@@ -0,0 +1,102 @@
+"""Tests of the packing of sibling operations and the fusing of linear chains."""
+
+import dataclasses
+import typing
+
+# Package imports
+import rifs
+from rifs.core import instrument, pack_runner
+from rifs.core.packing import PackedOperation, write_pack
+from rifs.core.soumission import _Job
+
+from operations import Fail, Touch
+
+
+def _lines(path):
+    with open(path, "r", encoding="utf-8") as open_file:
+        return open_file.readlines()
+
+
+def test_pack_merges_siblings_into_one_job(tmp_path):
+    root = Touch(path=str(tmp_path / "root"))
+    leaves = [Touch(path=str(tmp_path / f"leaf{index}"), depend_on=[root]) for index in range(5)]
+    constructor = rifs.Constructor([root] + leaves, pack=3)
+    resolved = constructor._resolve(constructor.build(), False)  # pylint: disable=protected-access
+    packed = [grouping for grouping in resolved if isinstance(grouping.operation, PackedOperation)]
+    assert [len(grouping.operation.operations) for grouping in packed] == [3, 2]
+    assert all(grouping.job.depend_on == [resolved.find(root).job] for grouping in packed)
+    reports = rifs.Constructor([root] + leaves, pack=3).run_local()
+    assert [report.returncode for report in reports] == [0, 0, 0]
+    assert all((tmp_path / f"leaf{index}").exists() for index in range(5))
+
+
+def test_pack_merges_raw_jobs():
+    handles = rifs.Constructor([_Job(command=["true"]), _Job(command=["true"])], pack=5).submit()
+    assert len(handles) == 1
+    assert handles[0].wait(30) == 0
+
+
+@dataclasses.dataclass
+class OtherInterpreterTouch(Touch):
+    """Create the file with another interpreter."""
+
+    command_override: typing.ClassVar[list] = ["python3", "-u"]
+
+
+def test_pack_runner_runs_every_command_after_a_failure(tmp_path):
+    touched = tmp_path / "touched"
+    assert pack_runner.run(write_pack([["false"], ["touch", str(touched)]])) == 1
+    assert touched.exists()
+
+
+def _fused(operations, **constructor_kwargs):
+    constructor = rifs.Constructor(operations, fuse=True, **constructor_kwargs)
+    return constructor._resolve(constructor.build(), False)  # pylint: disable=protected-access
+
+
+def test_fuse_runs_a_linear_chain_in_one_job(tmp_path):
+    path = str(tmp_path / "chain")
+    a = Touch(path=path)
+    b = Touch(path=path, depend_on=[a])
+    c = Touch(path=path, depend_on=[b])
+    branch = Touch(path=str(tmp_path / "branch"), depend_on=[c])
+    other = Touch(path=str(tmp_path / "other"), depend_on=[c])
+    resolved = _fused([a, b, c, branch, other])
+    assert len(list(resolved)) == 3
+    assert resolved.find(a) is resolved.find(c)
+    assert resolved.find(branch).job.depend_on == [resolved.find(a).job]
+    reports = rifs.Constructor([a, b, c, branch, other], fuse=True).run_local()
+    assert [report.returncode for report in reports] == [0, 0, 0]
+    # The steps share one interpreter
+    assert len(set(_lines(path))) == 1 and len(_lines(path)) == 3
+
+
+def test_fuse_stops_the_chain_at_a_failed_step(tmp_path):
+    failed = Fail()
+    after = Touch(path=str(tmp_path / "after"), depend_on=[failed])
+    reports = rifs.Constructor([failed, after], fuse=True).run_local()
+    assert [report.returncode for report in reports] == [1]
+    assert not (tmp_path / "after").exists()
+
+
+def test_fuse_records_the_chain_timings(tmp_path):
+    a = Touch(path=str(tmp_path / "a"))
+    b = Touch(path=str(tmp_path / "b"), depend_on=[a])
+    resolved = _fused([a, b], instrument=True)
+    (grouping,) = resolved
+    assert grouping.job.submit().wait(30) == 0
+    (record,) = instrument.collect(resolved)
+    assert record["operation_id"] == "0,1" and record["exit_status"] == 0
+
+
+def test_fuse_keeps_the_steps_it_cant_share_a_job_with(tmp_path):
+    a = Touch(path=str(tmp_path / "a"))
+    other_interpreter = OtherInterpreterTouch(path=str(tmp_path / "b"), depend_on=[a])
+    assert len(list(_fused([a, other_interpreter]))) == 2
+    # A tuple would come back from the manifest as a list
+    not_round_tripping = Touch(path=(str(tmp_path / "b"),), depend_on=[a])
+    assert len(list(_fused([a, not_round_tripping]))) == 2
+    other_env = Touch(path=str(tmp_path / "b"), depend_on=[a], soumission_kwargs={"env": {"NUKE_PATH": "/tools"}})
+    assert len(list(_fused([a, other_env]))) == 2
+    same_env = Touch(path=str(tmp_path / "b"), depend_on=[a])
+    assert len(list(_fused([a, same_env]))) == 1
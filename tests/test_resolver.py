@@ -0,0 +1,97 @@
+"""Tests of the resolver ordering, cycles and missing dependencies."""
+
+import logging
+
+import pytest
+
+# Package imports
+import rifs
+from rifs.core.resolver import ResolverCycleError
+from rifs.core.soumission import _Job
+
+from operations import Touch
+
+
+def _resolved_operations(operations):
+    return rifs.Constructor(operations).build().resolve().only_operations()
+
+
+def test_resolve_keeps_a_valid_injection_order():
+    a = Touch(path="a")
+    b = Touch(path="b", depend_on=[a])
+    c = Touch(path="c")
+    assert _resolved_operations([a, b, c]) == [a, b, c]
+
+
+def test_resolve_places_dependencies_first():
+    a = Touch(path="a")
+    b = Touch(path="b")
+    c = Touch(path="c")
+    a.depend_on = [c]
+    assert _resolved_operations([a, b, c]) == [b, c, a]
+
+
+def test_resolve_swaps_depend_on_to_jobs():
+    a = Touch(path="a")
+    b = Touch(path="b", depend_on=[a])
+    resolved = rifs.Constructor([a, b]).build().resolve()
+    assert resolved.find(b).job.depend_on == [resolved.find(a).job]
+
+
+def test_resolve_raises_on_cycle():
+    a = Touch(path="a")
+    b = Touch(path="b", depend_on=[a])
+    a.depend_on = [b]
+    with pytest.raises(ResolverCycleError) as error:
+        rifs.Constructor([a, b]).build().resolve()
+    assert len(error.value.cycle) == 3
+
+
+def test_resolve_raises_on_cycle_of_raw_jobs():
+    first = _Job(command=["true"])
+    second = _Job(command=["true"], depend_on=[first])
+    first.depend_on = [second]
+    with pytest.raises(ResolverCycleError):
+        rifs.Constructor([first, second]).build().resolve()
+
+
+def test_resolve_skips_missing_dependency_of_raw_job(caplog):
+    job = _Job(command=["true"], depend_on=[_Job(command=["true"])])
+    with caplog.at_level(logging.WARNING):
+        resolved = rifs.Constructor([job]).build().resolve()
+    assert not list(resolved)
+    assert "Skipping 1 groupings" in caplog.text
+
+
+def test_resolve_stream_yields_dependencies_first():
+    a = Touch(path="a")
+    b = Touch(path="b", depend_on=[a])
+    c = Touch(path="c", depend_on=[b])
+    d = Touch(path="d")
+    operations = [c, d, b, a]
+    streamed = [grouping.operation for grouping in rifs.Constructor(operations).stream()]
+    assert sorted(map(id, streamed)) == sorted(map(id, operations))
+    assert streamed.index(a) < streamed.index(b) < streamed.index(c)
+
+
+def _chain(length):
+    operations = [Touch(path="step0")]
+    for index in range(1, length):
+        operations.append(Touch(path=f"step{index}", depend_on=[operations[-1]]))
+    return operations
+
+
+def test_parallel_build_matches_the_serial_build():
+    operations = _chain(10) + [Touch(path=f"leaf{index}") for index in range(10)]
+    serial = rifs.Constructor(operations).build().resolve()
+    parallel = rifs.Constructor(operations, workers=4).build().resolve()
+    assert parallel.only_operations() == serial.only_operations()
+    assert [grouping.job.command for grouping in parallel] == [grouping.job.command for grouping in serial]
+
+
+def test_waves_only_depend_on_earlier_waves():
+    a, b, c = _chain(3)
+    d = Touch(path="d")
+    e = Touch(path="e", depend_on=[a, d])
+    waves = rifs.Constructor([e, c, b, a, d]).build().resolve().waves()
+    assert [[grouping.operation for grouping in wave] for wave in waves] == [[a, d], [b, e], [c]]
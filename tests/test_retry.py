@@ -0,0 +1,34 @@
+"""Tests of the retry of the failed frames of a render, rendered again by the fake Nuke workers."""
+
+# Package imports
+from rifs.operations import ruke
+from rifs.operations.ruke import NukeOperation, retry_failed_frames
+from rifs.operations.ruke_server import frame_status, render_locally
+
+
+def test_retry_failed_frames_renders_the_failed_frames_again(script, monkeypatch):
+    monkeypatch.setattr(ruke._time, "sleep", lambda seconds: None)  # pylint: disable=protected-access
+    operation = NukeOperation(script=script, frange="1-20")
+    monkeypatch.setenv("RIFS_FAKE_FAIL_FRAMES", "7")
+    status = frame_status(render_locally(operation.chunk(5), fake=True))
+    monkeypatch.delenv("RIFS_FAKE_FAIL_FRAMES")
+    retried = []
+
+    def render(retry):
+        retried.append(retry.frange)
+        return frame_status(render_locally([retry], fake=True))
+
+    final = retry_failed_frames(operation, status, render)
+    assert retried == ["6-10"]
+    assert operation.failed_frames(final) == []
+
+
+def test_retry_failed_frames_backs_off_until_the_attempts_run_out(monkeypatch):
+    delays = []
+    monkeypatch.setattr(ruke._time, "sleep", delays.append)  # pylint: disable=protected-access
+    operation = NukeOperation(script="/shots/comp.nk", frange="1-3")
+    final = retry_failed_frames(
+        operation, {1: "done"}, lambda retry: {2: "failed"}, attempts=3, backoff=10.0, max_backoff=25.0
+    )
+    assert delays == [10.0, 20.0, 25.0]
+    assert operation.failed_frames(final) == [2, 3]
@@ -0,0 +1,58 @@
+"""Tests of the Nuke render operation."""
+
+# Package imports
+from rifs.core.history import RuntimeHistory
+from rifs.operations.ruke import NukeOperation
+
+
+def test_command_passes_each_frame_range_part():
+    operation = NukeOperation(script="/shots/comp.nk", frange="1-10 20", nodes=["Write1"])
+    assert operation.command == ["nuke-race", "-t", "-F", "1-10", "-F", "20", "-X", "Write1", "--", "/shots/comp.nk"]
+
+
+def test_chunks_split_the_frame_range():
+    chunks = NukeOperation(script="/shots/comp.nk", frange="1-10").chunk(4)
+    assert [chunk.frange for chunk in chunks] == ["1-4", "5-8", "9-10"]
+    assert all(chunk.chunk_source is not None for chunk in chunks)
+
+
+def test_chunks_keep_the_user_notes():
+    chunks = NukeOperation(script="/shots/comp.nk", frange="1-10", notes="client v3").chunk(4)
+    assert chunks[0].notes == "Nuke | comp.nk | 1-4 | client v3 | chunk 1/3"
+    chunks = NukeOperation(script="/shots/comp.nk", frange="1-10").chunk(4)
+    assert chunks[2].notes == "Nuke | comp.nk | 9-10 | chunk 3/3"
+
+
+def test_retry_renders_only_the_failed_frames():
+    operation = NukeOperation(script="/shots/comp.nk", frange="1-2000", notes="client v3")
+    status = {frame: "done" for frame in range(1, 2001)}
+    status.update({17: "failed", 1500: "error", 1501: "failed"})
+    del status[1999]
+    retry = operation.retry(status)
+    assert retry.frange == "17 1500-1501 1999"
+    assert retry.command.count("-F") == 3
+    assert retry.notes == "Nuke | comp.nk | 17 1500-1501 1999 | client v3 | retry 1 of 4 frames"
+    assert operation.retry(dict.fromkeys(range(1, 2001), True)) is None
+
+
+def test_adaptive_chunk_keeps_an_unparsable_frame_range_in_one_job(tmp_path):
+    history = RuntimeHistory(str(tmp_path / "history.json"))
+    operation = NukeOperation(script="/shots/comp.nk", frange="1-100x0")
+    history.record(operation.history_key(), 10.0, 10)
+    assert operation.adaptive_chunk(history) == [operation]
+
+
+def test_command_flags_follow_the_field_order():
+    operation = NukeOperation(script="/shots/comp.nk", frange="1-10", topdown=True, gpu=True, not_writes=True)
+    assert operation.command_flags() == ("--gpu", "--rendertonull", "--topdown")
+    assert NukeOperation(script="/shots/comp.nk", frange="1-10").command_flags() == ()
+
+
+def test_command_places_the_flags_before_the_frame_ranges():
+    with_nodes = NukeOperation(script="/shots/comp.nk", frange="1-10", nodes=["Write1"], proxy_mode=True)
+    assert with_nodes.command[:5] == ["nuke-race", "-t", "-p", "-F", "1-10"]
+    every_write = NukeOperation(script="/shots/comp.nk", frange="1-10", proxy_mode=True)
+    assert every_write.command[:4] == ["nuke-race", "-t", "-x", "-p"]
+    every_write.gpu = True
+    every_write.build_command()
+    assert every_write.command[:5] == ["nuke-race", "-t", "-x", "--gpu", "-p"]
@@ -0,0 +1,52 @@
+"""Tests of the local render server with the fake Nuke workers."""
+
+import pytest
+
+# Package imports
+from rifs.core.history import RuntimeHistory
+from rifs.operations.ruke import NukeOperation
+from rifs.operations.ruke_server import NukeRenderServer, frame_status, render_locally
+
+
+def test_render_locally_renders_the_chunks(script, tmp_path):
+    history = RuntimeHistory(str(tmp_path / "history.json"))
+    chunks = NukeOperation(script=script, frange="1-20").chunk(5)
+    results = render_locally(chunks, workers=2, history=history, fake=True)
+    assert [result.operation for result in results] == chunks
+    assert all(result.ok for result in results)
+    assert history.estimate(chunks[0].history_key()).samples == 4
+
+
+def test_render_locally_reports_the_failed_chunks(script, monkeypatch):
+    monkeypatch.setenv("RIFS_FAKE_FAIL_FRAMES", "7")
+    chunks = NukeOperation(script=script, frange="1-20").chunk(5)
+    results = render_locally(chunks, fake=True)
+    assert [result.ok for result in results] == [True, False, True, True]
+    assert "frame 7" in results[1].error
+    # Without any node every enabled write node renders, the ones inside groups too
+    assert "Write1, Group1.Write1 failed" in results[1].error
+    status = frame_status(results)
+    assert sorted(frame for frame, state in status.items() if state != "done") == [6, 7, 8, 9, 10]
+
+
+def test_render_server_rejects_another_script(script):
+    with NukeRenderServer(script, workers=1, fake=True) as server:
+        with pytest.raises(ValueError):
+            server.render([NukeOperation(script="/shots/other.nk", frange="1-2")])
+
+
+def test_render_server_rejects_other_flags(script):
+    with NukeRenderServer(script, workers=1, fake=True) as server:
+        with pytest.raises(ValueError):
+            server.render([NukeOperation(script=script, frange="1-2", gpu=True)])
+
+
+def test_render_server_gives_the_flags_to_nuke(script):
+    server = NukeRenderServer(script, flags=NukeOperation(script=script, gpu=True, proxy_mode=True).command_flags())
+    assert server._worker_command()[:4] == ["nuke", "-t", "--gpu", "-p"]  # pylint: disable=protected-access
+
+
+def test_render_locally_starts_a_server_per_flags(script):
+    chunks = NukeOperation(script=script, frange="1-4").chunk(2)
+    chunks += NukeOperation(script=script, frange="5-8", gpu=True).chunk(2)
+    assert all(result.ok for result in render_locally(chunks, fake=True))
@@ -0,0 +1,73 @@
+"""Tests of the local scheduler."""
+
+import signal
+import sys
+
+import pytest
+
+# Package imports
+import rifs
+from rifs.core import scheduler
+from rifs.core.history import RuntimeHistory
+from rifs.core.resolver import Grouping
+from rifs.core.scheduler import LocalScheduler
+from rifs.core.soumission import _Job, JobHandle
+from rifs.operations.ruke import NukeOperation
+
+from operations import Fail, Touch
+
+
+def test_run_local_runs_raw_jobs():
+    reports = rifs.Constructor([_Job(command=["true"]), _Job(command=["false"])]).run_local()
+    assert [report.returncode for report in reports] == [0, 1]
+
+
+def test_run_local_runs_the_operations_in_dependency_order(tmp_path):
+    path = str(tmp_path / "touched")
+    a = Touch(path=path)
+    b = Touch(path=path, depend_on=[a])
+    reports = rifs.Constructor([b, a]).run_local()
+    assert [report.returncode for report in reports] == [0, 0]
+    with open(path, "r", encoding="utf-8") as open_file:
+        assert len(open_file.readlines()) == 2
+
+
+def test_run_local_skips_the_jobs_depending_on_a_failed_job(tmp_path):
+    failed = Fail()
+    child = Touch(path=str(tmp_path / "child"), depend_on=[failed])
+    sibling = Touch(path=str(tmp_path / "sibling"))
+    reports = rifs.Constructor([failed, child, sibling]).run_local(scheduler=LocalScheduler(cpus=4, ram=32000))
+    assert [(report.returncode, report.skipped) for report in reports] == [(1, False), (None, True), (0, False)]
+    assert not (tmp_path / "child").exists()
+
+
+def test_run_local_fails_a_job_that_cant_start(tmp_path):
+    missing = _Job(command=[str(tmp_path / "missing_executable")])
+    child = _Job(command=["true"], depend_on=[missing])
+    reports = rifs.Constructor([missing, child]).run_local()
+    assert [(report.returncode, report.skipped) for report in reports] == [
+        (JobHandle.LAUNCH_FAILED_RETURNCODE, False),
+        (None, True),
+    ]
+
+
+def test_run_local_cancels_the_running_jobs_when_interrupted(monkeypatch):
+    job = _Job(command=[sys.executable, "-c", "import time; time.sleep(30)"])
+
+    def interrupt(seconds):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(scheduler._time, "sleep", interrupt)  # pylint: disable=protected-access
+    with pytest.raises(KeyboardInterrupt):
+        rifs.Constructor([job]).run_local()
+    assert job.handle.wait(10) == -signal.SIGTERM
+
+
+def test_record_runtime_skips_an_unparsable_frame_range(tmp_path):
+    history = RuntimeHistory(str(tmp_path / "history.json"))
+    operation = NukeOperation(script="/shots/comp.nk", frange="%04d")
+    handle = JobHandle(["true"])
+    handle.wait(10)
+    grouping = Grouping(operation, _Job(command=["true"]))
+    assert not LocalScheduler(history=history)._record_runtime(grouping, handle)  # pylint: disable=protected-access
+    assert history.estimate(operation.history_key()) is None
@@ -0,0 +1,121 @@
+"""Tests of the local jobs and their handles."""
+
+import asyncio
+import signal
+import sys
+import time
+
+import pytest
+
+# Package imports
+import rifs
+from rifs.core.soumission import _Job, JobHandle, insert_jobs, standard_job
+
+from operations import Touch
+
+
+def _sleep_command(seconds, returncode=0):
+    return [sys.executable, "-c", f"import sys, time; time.sleep({seconds}); sys.exit({returncode})"]
+
+
+def test_handle_drains_the_output():
+    handle = JobHandle([sys.executable, "-c", "print('hello'); import sys; print('oops', file=sys.stderr)"])
+    assert handle.wait(10) == 0
+    assert handle.tail() == ["hello"]
+    assert handle.tail("stderr") == ["oops"]
+    with open(handle.log_paths["stdout"], "r", encoding="utf-8") as open_log_file:
+        assert open_log_file.read() == "hello\n"
+
+
+def test_handle_cancel_terminates_a_running_job():
+    handle = JobHandle(_sleep_command(30))
+    assert handle.cancel(grace=5.0)
+    assert handle.returncode == -signal.SIGTERM
+    assert not handle.cancel()
+
+
+def test_handle_cancel_never_starts_a_waiting_job():
+    parent = JobHandle(_sleep_command(30))
+    child = JobHandle(_sleep_command(0), depend_on=[parent])
+    assert child.cancel()
+    assert child.skipped and child.pid is None
+    parent.cancel()
+    assert child.wait(10) == -signal.SIGTERM
+
+
+def test_submit_returns_before_the_jobs_it_depends_on_finished():
+    a = _Job(command=_sleep_command(0.5))
+    b = _Job(command=_sleep_command(0.5), depend_on=[a])
+    c = _Job(command=_sleep_command(0.5), depend_on=[b])
+    e = _Job(command=_sleep_command(0.5))
+    start = time.monotonic()
+    handles = rifs.Constructor([a, b, c, e]).submit()
+    assert time.monotonic() - start < 0.5
+    assert e.handle.pid is not None and c.handle.pid is None
+    assert [handle.wait(30) for handle in handles] == [0, 0, 0, 0]
+    assert time.monotonic() - start >= 1.5
+
+
+def test_submit_skips_the_jobs_depending_on_a_failed_job():
+    a = _Job(command=_sleep_command(0, returncode=3))
+    b = _Job(command=_sleep_command(0), depend_on=[a])
+    c = _Job(command=_sleep_command(0), depend_on=[b])
+    rifs.Constructor([a, b, c]).submit()
+    assert c.handle.wait(30) == JobHandle.SKIPPED_RETURNCODE
+    assert b.handle.skipped and c.handle.skipped
+    assert a.handle.returncode == 3
+
+
+def test_handle_finishes_a_dependent_job_that_cant_start(tmp_path):
+    parent = JobHandle(_sleep_command(0))
+    child = JobHandle([str(tmp_path / "missing_executable")], depend_on=[parent])
+    assert child.wait(10) == JobHandle.LAUNCH_FAILED_RETURNCODE
+    assert child.skipped and child.pid is None
+    assert "missing_executable" in child.tail("stderr")[0]
+
+
+def test_jobs_follow_the_show_of_the_environment(monkeypatch):
+    monkeypatch.setenv("DD_SHOW", "FIRST")
+    assert standard_job().show == "FIRST"
+    monkeypatch.setenv("DD_SHOW", "SECOND")
+    (job,) = insert_jobs([Touch(path="touched")], ["script.py"])
+    assert standard_job().show == job.show == "SECOND"
+    assert job.command[-1] == "script.py"
+
+
+def _append_command(path, name, seconds=0.0, returncode=0):
+    return [
+        sys.executable,
+        "-c",
+        f"import sys, time; time.sleep({seconds}); open({str(path)!r}, 'a').write('{name}\\n'); sys.exit({returncode})",
+    ]
+
+
+def test_submit_async_runs_the_waves_in_dependency_order(tmp_path):
+    path = tmp_path / "order"
+    parent = _Job(command=_append_command(path, "parent", seconds=0.5))
+    child = _Job(command=_append_command(path, "child", returncode=3), depend_on=[parent])
+    sibling = _Job(command=_append_command(path, "sibling"))
+    processes = asyncio.run(rifs.Constructor([child, parent, sibling]).submit_async(concurrency=4))
+    # In resolved order, the child right after its parent
+    assert [process.returncode for process in processes] == [0, 3, 0]
+    # The sibling shares the first wave with the parent, the child waits for the parent
+    assert path.read_text(encoding="utf-8").split() == ["sibling", "parent", "child"]
+
+
+def test_only_one_async_returns_the_finished_process():
+    process = asyncio.run(rifs.only_one_async(_Job(command=_sleep_command(0, returncode=2))))
+    assert process.returncode == 2
+    with pytest.raises(TypeError):
+        asyncio.run(rifs.only_one_async("not an operation"))
+
+
+def test_concurrent_submit_keeps_the_resolved_order(tmp_path):
+    path = tmp_path / "order"
+    parent = _Job(command=_append_command(path, "parent", seconds=0.5))
+    child = _Job(command=_append_command(path, "child"), depend_on=[parent])
+    sibling = _Job(command=_append_command(path, "sibling"))
+    handles = rifs.Constructor([child, parent, sibling]).submit(concurrency=4)
+    assert handles == [parent.handle, child.handle, sibling.handle]
+    assert [handle.wait(30) for handle in handles] == [0, 0, 0]
+    assert path.read_text(encoding="utf-8").split() == ["sibling", "parent", "child"]
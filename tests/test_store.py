@@ -0,0 +1,69 @@
+"""Tests of the local json stores, the memo and the runtime history."""
+
+# Package imports
+import rifs
+from rifs.core import store
+from rifs.core.history import RuntimeHistory, batch_size
+from rifs.core.memo import MemoStore
+
+from operations import Touch
+
+
+def test_missing_or_corrupted_store_reads_as_empty(tmp_path):
+    assert store.load_json(str(tmp_path / "missing.json")) == {}
+    (tmp_path / "corrupted.json").write_text("{", encoding="utf-8")
+    assert store.load_json(str(tmp_path / "corrupted.json")) == {}
+
+
+def test_saved_store_reads_back(tmp_path):
+    path = store.save_json(str(tmp_path / "nested" / "store.json"), {"key": [1, 2]})
+    assert store.load_json(path) == {"key": [1, 2]}
+    assert [entry.name for entry in (tmp_path / "nested").iterdir()] == ["store.json"]
+
+
+def test_history_estimates_from_the_saved_samples(tmp_path):
+    path = str(tmp_path / "history.json")
+    history = RuntimeHistory(path)
+    for seconds in (10.0, 30.0, 20.0):
+        history.record("comp.nk|*", seconds, frames=10, peak_ram=1000, cpus=4)
+    estimate = RuntimeHistory(path).estimate("comp.nk|*")
+    assert (estimate.frame_seconds, estimate.peak_ram, estimate.cpus, estimate.samples) == (2.0, 1000, 4, 3)
+    assert batch_size(estimate.frame_seconds, target_seconds=60.0, frame_count=100) == 30
+
+
+def test_memo_skips_recorded_operations_with_their_outputs(tmp_path):
+    output = tmp_path / "output"
+    operation = Touch(path=str(output), outputs=[str(output)])
+    memo = MemoStore(str(tmp_path / "memo.json"))
+    memo.record(operation)
+    assert not MemoStore(memo.path).is_up_to_date(operation)
+    output.write_text("", encoding="utf-8")
+    assert MemoStore(memo.path).is_up_to_date(operation)
+
+
+def test_memo_evicts_the_least_recently_recorded(tmp_path):
+    memo = MemoStore(str(tmp_path / "memo.json"), max_entries=2)
+    first, second, third = (Touch(path=name, outputs=[name]) for name in ("first", "second", "third"))
+    memo.record(first)
+    memo.record(second)
+    assert memo.lookup(first) == ["first"]
+    memo.record(third)
+    reloaded = MemoStore(memo.path)
+    assert reloaded.lookup(first) is None and reloaded.lookup(second) == ["second"]
+
+
+def test_record_memo_records_the_operations_with_their_outputs(tmp_path):
+    written, missing = tmp_path / "written", tmp_path / "missing"
+    written.write_text("", encoding="utf-8")
+    operations = [Touch(path=str(path), outputs=[str(path)]) for path in (written, missing)]
+    memo = MemoStore(str(tmp_path / "memo.json"))
+    assert len(rifs.Constructor(operations, memo=memo).record_memo()) == 1
+    assert memo.is_up_to_date(operations[0]) and memo.lookup(operations[1]) is None
+
+
+def test_run_local_records_into_the_constructor_memo(tmp_path):
+    output = tmp_path / "output"
+    operation = Touch(path=str(output), outputs=[str(output)])
+    memo = MemoStore(str(tmp_path / "memo.json"))
+    rifs.Constructor([operation], memo=memo).run_local()
+    assert MemoStore(memo.path).is_up_to_date(operation)
@@ -0,0 +1,43 @@
+"""Tests of the generated scripts and manifests."""
+
+import json
+import os
+import shutil
+
+# Package imports
+from rifs.core import abstraction, transmission
+
+from operations import Touch
+
+
+def test_identical_operations_share_a_stored_script():
+    first = transmission.generate_script(Touch(path="same"))
+    assert first == transmission.generate_script(Touch(path="same"))
+    assert first != transmission.generate_script(Touch(path="other"))
+    assert os.path.exists(first)
+
+
+def test_purged_stored_script_is_written_again():
+    script = transmission.generate_script(Touch(path="purged"))
+    os.remove(script)
+    assert transmission.generate_script(Touch(path="purged")) == script
+    assert os.path.exists(script)
+
+
+def test_reused_stored_script_is_touched():
+    script = transmission.generate_script(Touch(path="reused"))
+    os.utime(script, (0, 0))
+    assert transmission.generate_script(Touch(path="reused")) == script
+    assert os.path.getmtime(script) > 0
+
+
+def test_manifest_holds_the_operation_entries():
+    manifest_path = transmission.generate_manifest({"0": Touch(path="a"), "1": Touch(path="b")})
+    with open(manifest_path, "r", encoding="utf-8") as open_manifest_file:
+        manifest = json.load(open_manifest_file)
+    assert manifest["operations"]["1"] == {"module": "operations", "class_name": "Touch", "kwargs": {"path": "b"}}
+
+
+def test_manifest_is_written_after_the_session_directory_was_purged():
+    shutil.rmtree(abstraction.session_temporary_directory())
+    assert os.path.exists(transmission.generate_manifest({"0": Touch(path="a")}))